@@ -1,29 +1,63 @@
 import time, os
-from tooldelta import Plugin, plugins, Print, Utils, game_utils
-from .nbtschematic import SchematicFile
-from .schematic_id import schema_id
+from tooldelta import Plugin, plugins, Print, Utils, game_utils, TYPE_CHECKING
+from .nbtschematic import LazySchematicFile, SpongeSchematicFile
+from .voxels import VoxelPlan
+from .java_blocks import JavaBlockTranslator
+from .checkpoint import CheckpointJournal, file_hash
+
+# 支持的文件: 旧版 schematic 与 Sponge schem (v2/v3)
+SCHEMA_SUFFIXES = (".schematic", ".schem")
 
 
 @plugins.add_plugin
 class SchematicImport(Plugin):
     name = "Schematic导入器"
     author = "SuperScript"
-    version = (0, 0, 1)
+    version = (0, 0, 7)
+    # 每放置多少个方块保存一次断点
+    CHECKPOINT_INTERVAL = 4096
+    # 断点格式版本, 放置计划改变后旧断点无法继续
+    CHECKPOINT_FORMAT = 2
 
     def __init__(self, frame):
         super().__init__(frame)
         self.make_data_path()
+        self.journal = CheckpointJournal(
+            os.path.join(self.data_path, "checkpoints.json")
+        )
+        self.translator = JavaBlockTranslator(
+            os.path.join(self.data_path, "Java方块对照表.json")
+        )
+
+    def on_def(self):
+        self.interact = plugins.get_plugin_api("前置-世界交互", (0, 0, 6))
+        if TYPE_CHECKING:
+            from 前置_世界交互 import GameInteractive
+
+            self.interact = plugins.instant_plugin_api(GameInteractive)
 
     def on_inject(self):
         self.get_x: float | None = None
         self.get_y: float | None = None
         self.get_z: float | None = None
         self.frame.add_console_cmd_trigger(
-            ["schematic"], None, "导入schematic文件", self.dump_schema_menu
+            ["schematic"], None, "导入schematic/schem文件", self.dump_schema_menu
         )
         self.frame.add_console_cmd_trigger(
             ["schem-get"], None, "设置schematic导入坐标", self.get_schema_pos_menu
         )
+        self.frame.add_console_cmd_trigger(
+            ["schematic-resume"],
+            None,
+            "从断点继续导入schematic文件",
+            self.resume_schema_menu,
+        )
+        self.frame.add_console_cmd_trigger(
+            ["schematic-plan"],
+            None,
+            "统计schematic文件合并前后的指令数 (不导入)",
+            self.dry_run_menu,
+        )
 
     def dump_schema_menu(self, _):
         src_path = self.data_path
@@ -31,7 +65,7 @@ class SchematicImport(Plugin):
             Print.print_err("未设置导入坐标 (控制台输入 schem-get 以设置)")
             return
         Print.print_inf(f"文件搜索路径: {src_path}")
-        fs = list(filter(lambda x: x.endswith(".schematic"), os.listdir(src_path)))
+        fs = list(filter(lambda x: x.endswith(SCHEMA_SUFFIXES), os.listdir(src_path)))
         if fs == []:
             Print.print_war("该文件夹内没有任何 schematic 文件, 无法导入")
             return
@@ -44,15 +78,11 @@ class SchematicImport(Plugin):
             return
         schema_file = fs[resp - 1]
         try:
-            schema_inf = SchematicFile.load(os.path.join(self.data_path, schema_file))
-            if schema_inf.root.get("Blocks") is None:
-                raise ValueError(
-                    "无法正常读取文件, 请确保这是Schematic文件而不是一个Schem文件"
-                )
+            schema_inf = self.load_schema(os.path.join(self.data_path, schema_file))
         except Exception as err:
             Print.print_err(f"读取 {schema_file} 出现问题: {err}")
             return
-        schema_name = schema_file[:-10]
+        schema_name = os.path.splitext(schema_file)[0]
         Print.print_inf(f"{schema_name} 的导入已经开始 (进度条显示于游戏内)")
         Utils.createThread(
             self.import_at,
@@ -62,9 +92,103 @@ class SchematicImport(Plugin):
                 int(self.get_x),
                 int(self.get_y),
                 int(self.get_z),
+                os.path.join(self.data_path, schema_file),
             ),
         )
 
+    def resume_schema_menu(self, _):
+        checkpoints = {
+            k: v
+            for k, v in self.journal.load_all().items()
+            if v.get("format") == self.CHECKPOINT_FORMAT
+        }
+        if not checkpoints:
+            Print.print_war("没有可继续的 schematic 导入")
+            return
+        names = list(checkpoints.keys())
+        Print.print_inf("请选择要继续导入的 schematic 文件:")
+        for i, j in enumerate(names):
+            cp = checkpoints[j]
+            Print.print_inf(
+                f" {i+1} - {j} (已执行 {cp['placed']} 条指令, 坐标 {tuple(cp['origin'])})"
+            )
+        resp = Utils.try_int(input(Print.fmt_info(f"请选择 (1~{len(names)}): ")))
+        if not resp or resp not in range(1, len(names) + 1):
+            Print.print_err("输入错, 已退出")
+            return
+        schema_file = names[resp - 1]
+        cp = checkpoints[schema_file]
+        schema_path = os.path.join(self.data_path, schema_file)
+        try:
+            if file_hash(schema_path) != cp["hash"]:
+                Print.print_err(f"{schema_file} 在中断后已被修改, 无法继续导入")
+                return
+            schema_inf = self.load_schema(schema_path)
+        except Exception as err:
+            Print.print_err(f"读取 {schema_file} 出现问题: {err}")
+            return
+        schema_name = os.path.splitext(schema_file)[0]
+        Print.print_inf(f"{schema_name} 的导入将从第 {cp['placed']} 条指令继续")
+        Utils.createThread(
+            self.import_at,
+            (schema_name, schema_inf, *cp["origin"], schema_path, cp["placed"]),
+        )
+
+    def dry_run_menu(self, _):
+        fs = [i for i in os.listdir(self.data_path) if i.endswith(SCHEMA_SUFFIXES)]
+        if fs == []:
+            Print.print_war("该文件夹内没有任何 schematic 文件")
+            return
+        total_before = total_after = 0
+        for schema_file in fs:
+            try:
+                schema = self.load_schema(os.path.join(self.data_path, schema_file))
+                plan = self.make_plan(schema, 0, 0, 0)
+            except Exception as err:
+                Print.print_err(f"读取 {schema_file} 出现问题: {err}")
+                continue
+            before, after = plan.blocks, len(plan)
+            total_before += before
+            total_after += after
+            Print.print_inf(
+                f"{schema_file}: 逐个放置 {before} 条指令, 合并后 {after} 条"
+                + (f" (节省 {1 - after / before:.1%})" if before else "")
+            )
+        if total_before:
+            Print.print_suc(
+                f"共计: 逐个放置 {total_before} 条指令, 合并后 {total_after} 条 "
+                f"(节省 {1 - total_after / total_before:.1%})"
+            )
+
+    @staticmethod
+    def load_schema(path: str) -> LazySchematicFile | SpongeSchematicFile:
+        "读取文件; 旧版 schematic 只建立索引, 方块数组在生成放置计划时才从磁盘映射读取"
+        if path.endswith(".schem"):
+            return SpongeSchematicFile.load(path)
+        schema = LazySchematicFile.load(path)
+        if "Blocks" not in schema.root:
+            schema.close()
+            raise ValueError(
+                "无法正常读取文件, 请确保这是Schematic文件而不是一个Schem文件"
+            )
+        return schema
+
+    def make_plan(
+        self, schema: LazySchematicFile | SpongeSchematicFile, x: int, y: int, z: int
+    ) -> VoxelPlan:
+        if isinstance(schema, SpongeSchematicFile):
+            plan = VoxelPlan.from_sponge(schema, self.translator, x, y, z)
+            if self.translator.unknown:
+                Print.print_war(
+                    "以下方块不在 Java方块对照表.json 中, 将按原名放置: "
+                    + ", ".join(sorted(self.translator.unknown))
+                )
+                self.translator.unknown.clear()
+            return plan
+        # 计划生成后不再需要原文件
+        with schema:
+            return VoxelPlan.from_schematic(schema, x, y, z)
+
     def get_schema_pos_menu(self, _):
         avali_players = self.game_ctrl.allplayers
         Print.print_inf("请选择玩家以获取其坐标:")
@@ -80,73 +204,56 @@ class SchematicImport(Plugin):
         self.get_x, self.get_y, self.get_z = game_utils.getPosXYZ(player_get)
         Print.print_inf(f"成功获取 {player_get} 的坐标.")
 
-    def import_at(self, name: str, schema: SchematicFile, x: int, y: int, z: int):
+    def import_at(
+        self,
+        name: str,
+        schema: LazySchematicFile | SpongeSchematicFile,
+        x: int,
+        y: int,
+        z: int,
+        path: str,
+        skip: int = 0,
+    ):
         # schem-get
         # schematic
-        size_x, size_y, size_z = schema.shape
-        blocks = schema.blocks
-        block_datas = schema.data
-        size_total = size_x * size_y * size_z
+        schema_file = os.path.basename(path)
+        checkpoint = {
+            "hash": file_hash(path),
+            "origin": [x, y, z],
+            "format": self.CHECKPOINT_FORMAT,
+        }
+        self.journal.save(schema_file, {**checkpoint, "placed": skip})
+        # 只放置非空气方块, 相同方块合并为 fill 指令, 按区块分组后逐个区块放置
+        plan = self.make_plan(schema, x, y, z)
+        # 由前置-世界交互统一限速
+        send = self.interact.governor.send
+        size_total = len(plan)
         timer = 0
-        prog_now = 0
-        prog_last = 0
-        for xp, yp, zp in self.snake_folding(int(size_x), int(size_y), int(size_z)):
-            prog_now += 1
-            block_id = int(blocks[xp, yp, zp])
-            block_data = int(block_datas[xp, yp, zp])
-            if block_id != 0:
-                block_id = schema_id[block_id]
-                self.game_ctrl.sendwocmd(
-                    f"setblock {x + yp} {y + xp} {z + zp} {block_id} {block_data}"
-                )
-                time.sleep(0.001)
-            if (new_timer := time.time()) - timer >= 1:
-                self.progress_bar(name, prog_now, size_total, prog_now - prog_last)
-                timer = new_timer
-                prog_last = prog_now
-                self.game_ctrl.sendwocmd(
-                    f"tp @a[name={self.game_ctrl.bot_name}] {x + yp} {y + xp} {z + zp}"
-                )
+        prog_now = skip
+        prog_last = skip
+        for placements in plan.chunks(skip):
+            bx, by, bz, _ = placements[0]
+            self.game_ctrl.sendwocmd(
+                f"tp @a[name={self.game_ctrl.bot_name}] {bx} {by} {bz}"
+            )
+            for _, _, _, cmd in placements:
+                send(cmd)
+                prog_now += 1
+                if (new_timer := time.time()) - timer >= 1:
+                    self.progress_bar(name, prog_now, size_total, prog_now - prog_last)
+                    timer = new_timer
+                    prog_last = prog_now
+                if prog_now % self.CHECKPOINT_INTERVAL == 0:
+                    self.journal.save(schema_file, {**checkpoint, "placed": prog_now})
         self.progress_bar(name, prog_now, size_total, prog_now - prog_last)
+        self.journal.remove(schema_file)
         Print.print_suc("导入成功")
 
-    @staticmethod
-    def snake_folding(size_x: int, size_y: int, size_z: int):
-        x = 0
-        y = 0
-        z = 0
-        ax = 1
-        ay = 1
-        az = 1
-        end_x = size_x - 1
-        end_y = size_y - 1
-        end_z = size_z - 1
-        yield 0, 0, 0
-        while (x, y, z) != (end_x, end_y, end_z):
-            x += ax
-            if x > end_x:
-                x = end_x
-                y += ay
-                ax = -1
-            elif x < 0:
-                x = 0
-                y += ay
-                ax = 1
-            if y > end_y:
-                y = end_y
-                z += az
-                ay = -1
-            elif y < 0:
-                y = 0
-                z += az
-                ay = 1
-            yield x, y, z
-
     def progress_bar(self, name: str, curr, tota, sped):
         if tota == 0:
             return
         n = round(curr / tota * 30)
         p = "§b" + "|" * n + "§f" + "|" * (30 - n)
         self.game_ctrl.player_actionbar(
-            "@a", f"导入 {name} 进度: §l{curr} §7/ {tota} 速度： {sped}方块每秒 §r\n{p}"
+            "@a", f"导入 {name} 进度: §l{curr} §7/ {tota} 速度： {sped}条指令每秒 §r\n{p}"
         )
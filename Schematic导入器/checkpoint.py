@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+
+
+def file_hash(path: str) -> str:
+    "计算文件的 sha1, 用于确认断点对应的仍是同一个文件"
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class CheckpointJournal:
+    """
+    导入断点记录, 以 文件名: 断点 的形式保存在一个 json 文件中
+
+    断点内容:
+        hash (str): 文件的 sha1
+        origin (list[int]): 导入坐标
+        format (int): 断点格式版本
+        placed (int): 已执行的指令数
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load_all(self) -> dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, name: str) -> dict | None:
+        return self.load_all().get(name)
+
+    def save(self, name: str, checkpoint: dict):
+        journal = self.load_all()
+        journal[name] = checkpoint
+        self._write(journal)
+
+    def remove(self, name: str):
+        journal = self.load_all()
+        if journal.pop(name, None) is not None:
+            self._write(journal)
+
+    def _write(self, journal: dict):
+        # 先写入临时文件再替换, 避免中途断开导致记录损坏
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(journal, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,163 @@
+import json
+import os
+from .schematic_id import schema_id
+
+# 不需要放置的方块
+AIR_BLOCKS = {"air", "cave_air", "void_air", "structure_void"}
+
+COLORS = [
+    "white",
+    "orange",
+    "magenta",
+    "light_blue",
+    "yellow",
+    "lime",
+    "pink",
+    "gray",
+    "light_gray",
+    "cyan",
+    "purple",
+    "blue",
+    "brown",
+    "green",
+    "red",
+    "black",
+]
+WOODS = ["oak", "spruce", "birch", "jungle", "acacia", "dark_oak"]
+
+
+def default_table() -> dict[str, str]:
+    """
+    Java 版方块 -> 基岩版方块 (setblock 中坐标之后的部分) 的默认对照表
+
+    键为去掉命名空间的 Java 方块名, 或带方块状态的完整写法 (如 oak_log[axis=x]);
+    此处未列出的方块将直接使用 Java 方块名, 数据值为 0.
+    """
+    table = {
+        "grass_block": "grass 0",
+        "dirt_path": "grass_path 0",
+        "coarse_dirt": "dirt 1",
+        "granite": "stone 1",
+        "polished_granite": "stone 2",
+        "diorite": "stone 3",
+        "polished_diorite": "stone 4",
+        "andesite": "stone 5",
+        "polished_andesite": "stone 6",
+        "red_sand": "sand 1",
+        "chiseled_sandstone": "sandstone 1",
+        "cut_sandstone": "sandstone 2",
+        "smooth_sandstone": "sandstone 3",
+        "stone_bricks": "stonebrick 0",
+        "mossy_stone_bricks": "stonebrick 1",
+        "cracked_stone_bricks": "stonebrick 2",
+        "chiseled_stone_bricks": "stonebrick 3",
+        "bricks": "brick_block 0",
+        "nether_bricks": "nether_brick 0",
+        "red_nether_bricks": "red_nether_brick 0",
+        "end_stone_bricks": "end_bricks 0",
+        "nether_quartz_ore": "quartz_ore 0",
+        "terracotta": "hardened_clay 0",
+        "snow_block": "snow 0",
+        "snow": "snow_layer 0",
+        "magma_block": "magma 0",
+        "slime_block": "slime 0",
+        "melon": "melon_block 0",
+        "jack_o_lantern": "lit_pumpkin 0",
+        "carved_pumpkin": "carved_pumpkin 0",
+        "spawner": "mob_spawner 0",
+        "cobweb": "web 0",
+        "note_block": "noteblock 0",
+        "sugar_cane": "reeds 0",
+        "lily_pad": "waterlily 0",
+        "dead_bush": "deadbush 0",
+        "grass": "tallgrass 1",
+        "short_grass": "tallgrass 1",
+        "fern": "tallgrass 2",
+        "dandelion": "yellow_flower 0",
+        "poppy": "red_flower 0",
+        "prismarine_bricks": "prismarine 2",
+        "dark_prismarine": "prismarine 1",
+        "chiseled_quartz_block": "quartz_block 1",
+        "quartz_pillar": "quartz_block 2",
+        "smooth_quartz": "quartz_block 3",
+        "oak_fence": "fence 0",
+        "cobblestone_wall": "cobblestone_wall 0",
+        "mossy_cobblestone_wall": "cobblestone_wall 1",
+        "wall_torch": "torch 0",
+        "redstone_wall_torch": "redstone_torch 0",
+        "water": "water 0",
+        "lava": "lava 0",
+    }
+    for i, color in enumerate(COLORS):
+        table[f"{color}_wool"] = f"wool {i}"
+        table[f"{color}_carpet"] = f"carpet {i}"
+        table[f"{color}_stained_glass"] = f"stained_glass {i}"
+        table[f"{color}_stained_glass_pane"] = f"stained_glass_pane {i}"
+        table[f"{color}_terracotta"] = f"stained_hardened_clay {i}"
+        table[f"{color}_concrete"] = f"concrete {i}"
+        table[f"{color}_concrete_powder"] = f"concrete_powder {i}"
+    for i, wood in enumerate(WOODS):
+        if i < 4:
+            log, leaves, data = "log", "leaves", i
+        else:
+            log, leaves, data = "log2", "leaves2", i - 4
+        table[f"{wood}_planks"] = f"planks {i}"
+        table[f"{wood}_sapling"] = f"sapling {i}"
+        table[f"{wood}_log"] = f"{log} {data}"
+        table[f"{wood}_log[axis=y]"] = f"{log} {data}"
+        table[f"{wood}_log[axis=x]"] = f"{log} {data + 4}"
+        table[f"{wood}_log[axis=z]"] = f"{log} {data + 8}"
+        table[f"{wood}_leaves"] = f"{leaves} {data}"
+        table[f"{wood}_slab"] = f"wooden_slab {i}"
+        table[f"{wood}_slab[type=top]"] = f"wooden_slab {i + 8}"
+        table[f"{wood}_slab[type=double]"] = f"double_wooden_slab {i}"
+    return table
+
+
+class JavaBlockTranslator:
+    """
+    将 Java 版方块状态 (如 minecraft:oak_log[axis=x,waterlogged=false]) 转换为基岩版方块
+
+    对照表保存在 table_path, 不存在时写入默认对照表, 可自行补充;
+    每个方块状态只查找一次, 结果会被缓存.
+    查找顺序: 带全部方块状态的写法, 只带第一个方块状态的写法, 方块名.
+    """
+
+    def __init__(self, table_path: str):
+        self.table_path = table_path
+        if os.path.isfile(table_path):
+            with open(table_path, encoding="utf-8") as f:
+                self.table: dict[str, str] = json.load(f)
+        else:
+            self.table = default_table()
+            with open(table_path, "w", encoding="utf-8") as f:
+                json.dump(self.table, f, indent=2, ensure_ascii=False)
+        self._cache: dict[str, str | None] = {}
+        # 对照表中没有的方块名
+        self.unknown: set[str] = set()
+
+    def translate(self, state: str) -> str | None:
+        "返回基岩版 setblock 中坐标之后的部分, 空气返回 None"
+        if state in self._cache:
+            return self._cache[state]
+        block = self._cache[state] = self._lookup(state)
+        return block
+
+    def _lookup(self, state: str) -> str | None:
+        if state.startswith("minecraft:"):
+            state = state[10:]
+        name, _, props = state.partition("[")
+        if name in AIR_BLOCKS:
+            return None
+        if props:
+            if state in self.table:
+                return self.table[state]
+            first = props.rstrip("]").split(",")[0]
+            if (key := f"{name}[{first}]") in self.table:
+                return self.table[key]
+        if name in self.table:
+            return self.table[name]
+        if name not in schema_id:
+            # 两个版本同名的方块无需列入对照表
+            self.unknown.add(name)
+        return f"{name} 0"
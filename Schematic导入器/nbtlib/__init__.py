@@ -1,5 +1,7 @@
 from .tag import *
 from .nbt import *
+from .lazy import LazyFile as LazyFile
+from .lazy import LazyCompound as LazyCompound
 from .path import *
 from .schema import *
 from .literal.parser import *
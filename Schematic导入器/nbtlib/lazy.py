@@ -0,0 +1,193 @@
+"""Lazy, memory-bounded reading of nbt files.
+
+:class:`LazyFile` decompresses the file into a temporary file and indexes
+the offsets of every tag nested in compounds in a single streaming pass,
+skipping over the payloads. Tags are only parsed when they are accessed,
+and array tags are returned as read-only ``numpy.memmap`` views over the
+decompressed data, so large ``Blocks`` arrays never have to be loaded
+into memory and unused lists such as ``Entities`` are never parsed.
+"""
+
+
+__all__ = ["LazyCompound", "LazyFile"]
+
+
+import gzip
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .tag import (
+    BYTE,
+    INT,
+    USHORT,
+    Base,
+    ByteArray,
+    IntArray,
+    LongArray,
+    read_numeric,
+    read_string,
+)
+
+ARRAY_TAGS = {7: ByteArray, 11: IntArray, 12: LongArray}
+FIXED_SIZES = {1: 1, 2: 2, 3: 4, 4: 8, 5: 4, 6: 8}
+
+
+class LazyFile:
+    """Class representing a lazily loaded nbt file.
+
+    Arguments:
+        filename: The name of the file.
+        gzipped: Whether the file is gzipped, detected from the magic
+            number when ``None``.
+        byteorder: Can be either ``"big"`` or ``"little"``.
+        tmpdir: Directory of the temporary decompressed file.
+
+    Attributes:
+        root_name: The name of the root tag.
+        root: A :class:`LazyCompound` for the root tag.
+
+    The file must be closed with :meth:`close` (or used as a context
+    manager) to remove the temporary file. Arrays returned by the file stay
+    valid after closing on posix systems, but should be released first on
+    windows.
+    """
+
+    def __init__(self, filename, *, gzipped=None, byteorder="big", tmpdir=None):
+        if gzipped is None:
+            with open(filename, "rb") as fileobj:
+                gzipped = fileobj.read(2) == b"\x1f\x8b"
+        self.byteorder = byteorder
+        self.temporary = gzipped
+        if gzipped:
+            fd, self.path = tempfile.mkstemp(suffix=".nbt", dir=tmpdir)
+            with os.fdopen(fd, "wb") as out, gzip.open(filename, "rb") as src:
+                shutil.copyfileobj(src, out, 1 << 20)
+        else:
+            self.path = filename
+        self._fileobj = open(self.path, "rb")
+        self._index = {}
+        try:
+            if read_numeric(BYTE, self._fileobj, byteorder) != 10:
+                raise ValueError("The root tag of the file is not a compound")
+            self.root_name = read_string(self._fileobj, byteorder)
+            self._index_compound(())
+        except BaseException:
+            self.close()
+            raise
+        self.root = LazyCompound(self, ())
+
+    def _index_compound(self, path):
+        fileobj = self._fileobj
+        entries = self._index[path] = {}
+        while True:
+            tag_id = read_numeric(BYTE, fileobj, self.byteorder)
+            if tag_id == 0:
+                return
+            name = read_string(fileobj, self.byteorder)
+            entries[name] = (tag_id, fileobj.tell())
+            if tag_id == 10:
+                self._index_compound((*path, name))
+            else:
+                self._skip(tag_id)
+
+    def _skip(self, tag_id):
+        fileobj = self._fileobj
+        byteorder = self.byteorder
+        if tag_id in FIXED_SIZES:
+            fileobj.seek(FIXED_SIZES[tag_id], 1)
+        elif tag_id in ARRAY_TAGS:
+            itemsize = ARRAY_TAGS[tag_id].item_type[byteorder].itemsize
+            fileobj.seek(read_numeric(INT, fileobj, byteorder) * itemsize, 1)
+        elif tag_id == 8:
+            fileobj.seek(read_numeric(USHORT, fileobj, byteorder), 1)
+        elif tag_id == 9:
+            item_id = read_numeric(BYTE, fileobj, byteorder)
+            length = read_numeric(INT, fileobj, byteorder)
+            if item_id in FIXED_SIZES:
+                fileobj.seek(FIXED_SIZES[item_id] * length, 1)
+            else:
+                for _ in range(length):
+                    self._skip(item_id)
+        elif tag_id == 10:
+            while (item_id := read_numeric(BYTE, fileobj, byteorder)) != 0:
+                fileobj.seek(read_numeric(USHORT, fileobj, byteorder), 1)
+                self._skip(item_id)
+        else:
+            raise ValueError(f"Unknown tag id {tag_id}")
+
+    def _materialize(self, path, tag_id, offset):
+        if tag_id == 10:
+            return LazyCompound(self, path)
+        self._fileobj.seek(offset)
+        if tag_id in ARRAY_TAGS:
+            tag = ARRAY_TAGS[tag_id]
+            length = read_numeric(INT, self._fileobj, self.byteorder)
+            if length == 0:
+                return tag()
+            return np.memmap(
+                self.path,
+                dtype=tag.item_type[self.byteorder],
+                mode="r",
+                offset=offset + 4,
+                shape=(length,),
+            )
+        return Base.get_tag(tag_id).parse(self._fileobj, self.byteorder)
+
+    def close(self):
+        """Close the file and remove the temporary decompressed file."""
+        self._fileobj.close()
+        if self.temporary:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class LazyCompound:
+    """Read-only mapping over an indexed compound tag of a :class:`LazyFile`.
+
+    Nested compounds are returned as :class:`LazyCompound` instances, arrays
+    as ``numpy.memmap`` views and every other tag is parsed on access.
+    """
+
+    def __init__(self, file, path):
+        self.file = file
+        self.path = path
+        self._entries = file._index[path]
+
+    def __getitem__(self, key):
+        tag_id, offset = self._entries[key]
+        return self.file._materialize((*self.path, key), tag_id, offset)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._entries else default
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        return self._entries.keys()
+
+    def values(self):
+        return [self[key] for key in self._entries]
+
+    def items(self):
+        return [(key, self[key]) for key in self._entries]
+
+    def __repr__(self):
+        return f"<LazyCompound {'/'.join(self.path) or '.'}: {list(self._entries)}>"
@@ -13,3 +13,6 @@ from .schematic import Schematic        # noqa:F401
 from .schematic import SchematicFile    # noqa:F401
 from .schematic import Material         # noqa:F401
 from .schematic import SchematicFileRoot  # noqa:F401
+from .schematic import LazySchematicFile  # noqa:F401
+from .sponge import SpongeSchematicFile  # noqa:F401
+from .sponge import decode_varints      # noqa:F401
@@ -264,3 +264,58 @@ class SchematicFile(nbt.File, SchematicFileRoot):
 
     def __enter__(self):
         return self.root
+
+
+class LazySchematicFile:
+    """
+    Schematic File, read lazily
+
+    Only the dimensions and the ``Blocks`` and ``Data`` arrays are ever
+    materialised; both arrays are read-only memory maps over a decompressed
+    temporary copy of the file, and lists such as ``Entities`` are skipped
+    without being parsed. Call :meth:`close` once the arrays are no longer
+    needed to remove the temporary file.
+    """
+
+    def __init__(self, nbt_file: nbt.LazyFile):
+        self.nbt_file = nbt_file
+        self.root = nbt_file.root
+
+    @classmethod
+    def load(cls, filename) -> "LazySchematicFile":
+        """
+        Load a schematic file from disk lazily
+
+        :param filename: Path to a schematic file on disk.
+        :return: Loaded schematic
+        """
+        return cls(nbt.LazyFile(filename))
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """ Schematic shape
+
+        :return: Shape of the schematic, as a tuple of ``Y``, ``Z``, and ``X``
+                 size.
+        """
+        return (int(self.root["Height"]), int(self.root["Length"]),
+                int(self.root["Width"]))
+
+    @property
+    def blocks(self) -> np.ndarray:
+        """ Block IDs, see :attr:`SchematicFile.blocks` """
+        return self.root["Blocks"].reshape(self.shape, order="C")
+
+    @property
+    def data(self) -> np.ndarray:
+        """ Block data, see :attr:`SchematicFile.data` """
+        return self.root["Data"].reshape(self.shape, order="C")
+
+    def close(self):
+        self.nbt_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,191 @@
+import itertools
+from collections.abc import Callable
+import numpy as np
+from .schematic_id import schema_id
+
+# 单条 /fill 指令最多可填充的方块数
+FILL_VOLUME_LIMIT = 32768
+# 合并区域在水平方向上的最大边长, 保证传送到区域中心后整个区域都已加载
+MAX_HORIZONTAL_SPAN = 64
+
+
+def block_keys(blocks, datas) -> np.ndarray:
+    "将方块 ID 与数据值合并为 uint16 (ID << 8 | 数据值), 空气为 0"
+    # nbtlib 的 ByteArray 为有符号字节, 方块 ID 需按无符号读取
+    ids = np.asarray(blocks).view(np.uint8)
+    keys = ids.astype(np.uint16) << 8
+    keys |= np.asarray(datas).view(np.uint8)
+    keys[ids == 0] = 0
+    return keys
+
+
+def legacy_block(key: int) -> str:
+    "block_keys 的键值 -> setblock 中坐标之后的部分"
+    return f"{schema_id[key >> 8]} {key & 0xFF}"
+
+
+def greedy_boxes(keys: np.ndarray):
+    """
+    将相同的非空气体素贪心合并为尽可能大的长方体
+
+    按数组下标顺序扫描, 以每个未被覆盖的体素为起点,
+    依次沿第三, 第二, 第一维扩展, 体积不超过 FILL_VOLUME_LIMIT.
+
+    Args:
+        keys (np.ndarray): 方块键值数组, 0 为空气
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: 长方体的最小下标, 最大下标 (均为 n x 3) 与方块键值
+    """
+    height, length, width = keys.shape
+    done = keys == 0
+    los: list[tuple[int, int, int]] = []
+    sizes: list[tuple[int, int, int]] = []
+    box_keys: list[int] = []
+    for flat in np.flatnonzero(keys).tolist():
+        i0, rem = divmod(flat, length * width)
+        i1, i2 = divmod(rem, width)
+        if done[i0, i1, i2]:
+            continue
+        k = keys[i0, i1, i2]
+        if i2 + 1 < width and (keys[i0, i1, i2 + 1] != k or done[i0, i1, i2 + 1]):
+            n2 = 1
+        else:
+            row = (keys[i0, i1, i2:] != k) | done[i0, i1, i2:]
+            n2 = int(row.argmax()) if row.any() else width - i2
+            n2 = min(n2, MAX_HORIZONTAL_SPAN)
+        n1 = 1
+        limit = min(MAX_HORIZONTAL_SPAN, FILL_VOLUME_LIMIT // n2, length - i1)
+        while n1 < limit:
+            if (keys[i0, i1 + n1, i2 : i2 + n2] != k).any() or done[
+                i0, i1 + n1, i2 : i2 + n2
+            ].any():
+                break
+            n1 += 1
+        n0 = 1
+        limit = min(FILL_VOLUME_LIMIT // (n1 * n2), height - i0)
+        while n0 < limit:
+            if (keys[i0 + n0, i1 : i1 + n1, i2 : i2 + n2] != k).any() or done[
+                i0 + n0, i1 : i1 + n1, i2 : i2 + n2
+            ].any():
+                break
+            n0 += 1
+        done[i0 : i0 + n0, i1 : i1 + n1, i2 : i2 + n2] = True
+        los.append((i0, i1, i2))
+        sizes.append((n0, n1, n2))
+        box_keys.append(int(k))
+    lo = np.array(los, dtype=np.int64).reshape(-1, 3)
+    hi = lo + np.array(sizes, dtype=np.int64).reshape(-1, 3) - 1
+    return lo, hi, np.array(box_keys, dtype=keys.dtype)
+
+
+class VoxelPlan:
+    """
+    Schematic 中所有非空气方块的放置计划
+
+    每条指令放置一个方块 (setblock) 或一个长方体 (fill),
+    指令按区域所在区块排序 (区块按 x 逐列蛇形遍历, 区块内按 y, x, z 排序);
+    方块序号对应的指令参数 (如 "stone 0") 已预先生成.
+
+    Args:
+        keys (np.ndarray): 方块键值数组, 下标顺序为 (高度, 长度, 宽度), 0 为空气
+        block_name (Callable[[int], str]): 键值 -> setblock 中坐标之后的部分
+        x, y, z (int): 导入坐标
+        merge (bool): 是否将相同方块合并为 fill 指令
+
+    Attributes:
+        lo, hi (np.ndarray): 各指令区域的最小 / 最大世界坐标 (n x 3, 顺序为 x, y, z)
+        palette_ids (np.ndarray): 方块序号
+        palette (list[str]): 方块序号 -> "方块名 数据值"
+        chunk_starts (np.ndarray): 每个区块的首条指令下标, 末尾额外包含指令总数
+        blocks (int): 放置的方块总数
+    """
+
+    def __init__(
+        self,
+        keys: np.ndarray,
+        block_name: Callable[[int], str],
+        x: int,
+        y: int,
+        z: int,
+        merge: bool = True,
+    ):
+        if merge:
+            lo, hi, box_keys = greedy_boxes(keys)
+        else:
+            flat = np.flatnonzero(keys)
+            lo = hi = np.stack(np.unravel_index(flat, keys.shape), axis=1)
+            box_keys = keys.reshape(-1)[flat]
+        # 数组下标顺序为 (高度, 长度, 宽度), 对应世界坐标 (y, x, z)
+        offset = np.array([x, y, z], dtype=np.int64)
+        lo = lo[:, [1, 0, 2]].astype(np.int64) + offset
+        hi = hi[:, [1, 0, 2]].astype(np.int64) + offset
+        cx = lo[:, 0] >> 4
+        cz = lo[:, 2] >> 4
+        # 奇数列的区块按 z 倒序遍历
+        column = cx - (cx.min() if len(cx) else 0)
+        cz_order = np.where(column & 1 == 1, -cz, cz)
+        order = np.lexsort((lo[:, 2], lo[:, 0], lo[:, 1], cz_order, cx))
+        self.lo = lo[order]
+        self.hi = hi[order]
+        self.blocks = int(np.prod(self.hi - self.lo + 1, axis=1).sum())
+        cx = cx[order]
+        cz = cz[order]
+        uniq, self.palette_ids = np.unique(box_keys[order], return_inverse=True)
+        self.palette: list[str] = [block_name(k) for k in uniq.tolist()]
+        changed = np.flatnonzero((cx[1:] != cx[:-1]) | (cz[1:] != cz[:-1])) + 1
+        self.chunk_starts = np.concatenate(([0], changed, [len(order)]))
+
+    @classmethod
+    def from_schematic(cls, schema, x: int, y: int, z: int, merge: bool = True):
+        "由旧版 Schematic (方块 ID + 数据值) 生成放置计划"
+        keys = block_keys(schema.blocks, schema.data)
+        return cls(keys, legacy_block, x, y, z, merge)
+
+    @classmethod
+    def from_sponge(
+        cls, schema, translator, x: int, y: int, z: int, merge: bool = True
+    ):
+        "由 Sponge Schematic (方块状态调色板) 生成放置计划, translator 为 JavaBlockTranslator"
+        blocks = [translator.translate(state) for state in schema.palette]
+        # 调色板序号 + 1 作为键值, 空气为 0
+        lookup = np.array(
+            [0 if b is None else i + 1 for i, b in enumerate(blocks)],
+            dtype=schema.blocks.dtype,
+        )
+        keys = lookup[schema.blocks]
+        return cls(keys, lambda k: blocks[k - 1], x, y, z, merge)
+
+    def __len__(self):
+        return len(self.lo)
+
+    def chunks(self, skip: int = 0):
+        """
+        逐个区块遍历放置计划
+
+        Args:
+            skip (int): 跳过前 skip 条指令
+
+        Yields:
+            list[tuple[int, int, int, str]]: 区块内各指令区域的中心坐标 (x, y, z) 与指令
+        """
+        palette = self.palette
+        starts = self.chunk_starts.tolist()
+        for start, end in itertools.pairwise(starts):
+            if end <= skip:
+                continue
+            start = max(start, skip)
+            placements = []
+            for (x0, y0, z0), (x1, y1, z1), p in zip(
+                self.lo[start:end].tolist(),
+                self.hi[start:end].tolist(),
+                self.palette_ids[start:end].tolist(),
+            ):
+                if x0 == x1 and y0 == y1 and z0 == z1:
+                    cmd = f"setblock {x0} {y0} {z0} {palette[p]}"
+                else:
+                    cmd = f"fill {x0} {y0} {z0} {x1} {y1} {z1} {palette[p]}"
+                placements.append(
+                    ((x0 + x1) // 2, (y0 + y1) // 2, (z0 + z1) // 2, cmd)
+                )
+            yield placements
@@ -1,4 +1,4 @@
-from tooldelta import Frame, Plugin, packets, plugins
+from tooldelta import Frame, Plugin, packets, plugins, TYPE_CHECKING
 from tooldelta.game_utils import getPosXYZ
 from tooldelta.launch_cli import SysStatus
 from tooldelta.game_utils import getPosXYZ
@@ -19,7 +19,7 @@ class UpdatePlayerAttributes:
 class ToolDeltaFuncLib1(Plugin):
     name = "前置-功能封装库-1"
     author = "xingchen"
-    version = (0, 0, 3)
+    version = (0, 0, 4)
 
     def __init__(self, frame: Frame):
         self.frame = frame
@@ -32,6 +32,13 @@ class ToolDeltaFuncLib1(Plugin):
         )
         self.tp_players_thread.start()
 
+    def on_def(self):
+        self.funclib = plugins.get_plugin_api("基本插件功能库", (0, 0, 13))
+        if TYPE_CHECKING:
+            from 前置_基本插件功能库 import BasicFunctionLib
+
+            self.funclib = plugins.instant_plugin_api(BasicFunctionLib)
+
     def update_player_attributes_listener(self, players: str | list[str]) -> Callable:
         """
         监听玩家属性更新事件
@@ -68,15 +75,14 @@ class ToolDeltaFuncLib1(Plugin):
 
         """
 
+        if not self.listener_players_update_attributes_listener:
+            return
+        name = self.get_player_name_from_entity_runtime(packet["EntityRuntimeID"])
         for player, func in self.listener_players_update_attributes_listener:
-            if player == self.get_player_name_from_entity_runtime(
-                packet["EntityRuntimeID"]
-            ):
+            if player == name:
                 func(
                     UpdatePlayerAttributes(
-                        self.get_player_name_from_entity_runtime(
-                            packet["EntityRuntimeID"]
-                        ),
+                        name,
                         packet["Attributes"],
                         packet["Tick"],
                     )
@@ -96,12 +102,7 @@ class ToolDeltaFuncLib1(Plugin):
         Returns:
             str | None: 玩家名
         """
-        if not self.frame.link_game_ctrl.all_players_data:
-            return None
-        for player in self.frame.link_game_ctrl.all_players_data:
-            if player.entity_runtime_id == runtimeid:
-                return player.name
-        return None
+        return self.funclib.getPlayerByRuntimeID(runtimeid)
 
     def on_player_leave(self, player_name: str):
         """
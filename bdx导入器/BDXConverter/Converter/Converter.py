@@ -3,6 +3,7 @@ from io import BytesIO
 from copy import deepcopy
 from .ErrorClassDefine import HeaderError
 from .ErrorClassDefine import ReadError, UnknownOperationError
+from .Decoder import OperationStream
 from ..General.GeneralClass import GeneralClass
 from ..General.Pool import GetBDXCommandPool
 from ..utils.getString import getByte, getString
@@ -184,6 +185,14 @@ class BDX_2(GeneralClass):
                 yield struct
                 # submit single data
 
+    @property
+    def Operations(self) -> OperationStream:
+        """
+        Decode the valid contents with the table-driven decoder,
+        see `Decoder` for the layout of each record
+        """
+        return OperationStream(self._buffer, self._offset)
+
     def UnMarshal(self, binaryData: bytes) -> None:
         if binaryData[0:3] != b"BD@":
             raise HeaderError(binaryData[:3])
@@ -200,3 +209,5 @@ class BDX_2(GeneralClass):
         self.AuthorName = getString(reader)
         # get author's name
         self._reader = reader
+        self._buffer = reader.getvalue()
+        self._offset = reader.tell()
@@ -0,0 +1,292 @@
+"""
+Table-driven decoder for the operation stream of a BDX file
+
+Every operation is decoded straight from the decompressed buffer with
+precompiled `struct.Struct` readers, so no operation object is deep copied
+and no intermediate bytes object is allocated for numeric fields.
+
+Each operation is yielded as a plain tuple whose first item is the
+operation number, followed by the fields of that operation in file order:
+
+    1:                    (1, constantString)
+    5:                    (5, blockConstantStringID, blockStatesConstantStringID)
+    6 / 12 / 20 ~ 25:     (op, value)
+    7:                    (7, blockConstantStringID, blockData)
+    8 / 9 / 14 ~ 19 / 41: (op,)
+    13:                   (13, blockConstantStringID, blockStatesString)
+    26:                   (26, CommandBlockData)
+    27:                   (27, blockConstantStringID, blockData, CommandBlockData)
+    28 / 29 / 30:         (op, value)
+    31:                   (31, poolId)
+    32 / 33:              (op, runtimeId)
+    34 / 35:              (op, runtimeId, CommandBlockData)
+    36:                   (36, data, CommandBlockData)
+    37 / 38:              (op, runtimeId, slots)
+    39:                   (39, buffer)
+    40:                   (40, blockConstantStringID, blockData, slots)
+
+`slots` is a list of `(itemName, count, data, slotID)` tuples.
+"""
+
+from struct import Struct, error as StructError
+from collections.abc import Callable, Iterator
+from .ErrorClassDefine import UnknownOperationError
+
+OperationRecord = tuple
+OperationReader = Callable[[bytes, memoryview, int], tuple[OperationRecord, int]]
+
+_UINT8 = Struct(">B")
+_UINT16 = Struct(">H")
+_UINT32 = Struct(">I")
+_BLOCK = Struct(">HH")
+_CHEST_HEAD = Struct(">HHB")
+_COMMAND_BLOCK_TAIL = Struct(">I????")
+_CHEST_SLOT_TAIL = Struct(">BHB")
+
+
+class CommandBlockData:
+    """
+    Command block fields shared by operation 26, 27, 34, 35 and 36
+    """
+
+    __slots__ = (
+        "command",
+        "conditional",
+        "customName",
+        "executeOnFirstTick",
+        "lastOutput",
+        "mode",
+        "needsRedstone",
+        "tickDelay",
+        "trackOutput",
+    )
+
+    def __init__(
+        self,
+        mode: int,
+        command: str,
+        customName: str,
+        lastOutput: str,
+        tickDelay: int,
+        executeOnFirstTick: bool,
+        trackOutput: bool,
+        conditional: bool,
+        needsRedstone: bool,
+    ) -> None:
+        self.mode = mode
+        self.command = command
+        self.customName = customName
+        self.lastOutput = lastOutput
+        self.tickDelay = tickDelay
+        self.executeOnFirstTick = executeOnFirstTick
+        self.trackOutput = trackOutput
+        self.conditional = conditional
+        self.needsRedstone = needsRedstone
+
+
+def _readString(buffer: bytes, view: memoryview, pos: int) -> tuple[str, int]:
+    end = buffer.find(b"\x00", pos)
+    if end < 0:
+        raise EOFError
+    return str(view[pos:end], "utf-8", "replace"), end + 1
+
+
+def _readCommandBlockData(
+    buffer: bytes, view: memoryview, pos: int
+) -> tuple[CommandBlockData, int]:
+    (mode,) = _UINT32.unpack_from(buffer, pos)
+    command, pos = _readString(buffer, view, pos + 4)
+    customName, pos = _readString(buffer, view, pos)
+    lastOutput, pos = _readString(buffer, view, pos)
+    tail = _COMMAND_BLOCK_TAIL.unpack_from(buffer, pos)
+    return (
+        CommandBlockData(mode, command, customName, lastOutput, *tail),
+        pos + _COMMAND_BLOCK_TAIL.size,
+    )
+
+
+def _readChestSlots(
+    buffer: bytes, view: memoryview, pos: int, slotCount: int
+) -> tuple[list[tuple[str, int, int, int]], int]:
+    slots = []
+    for _ in range(slotCount):
+        itemName, pos = _readString(buffer, view, pos)
+        slots.append((itemName, *_CHEST_SLOT_TAIL.unpack_from(buffer, pos)))
+        pos += _CHEST_SLOT_TAIL.size
+    return slots, pos
+
+
+def _op1(buffer: bytes, view: memoryview, pos: int):
+    constantString, pos = _readString(buffer, view, pos)
+    return (1, constantString), pos
+
+
+def _op13(buffer: bytes, view: memoryview, pos: int):
+    (blockId,) = _UINT16.unpack_from(buffer, pos)
+    blockStatesString, pos = _readString(buffer, view, pos + 2)
+    return (13, blockId, blockStatesString), pos
+
+
+def _op26(buffer: bytes, view: memoryview, pos: int):
+    data, pos = _readCommandBlockData(buffer, view, pos)
+    return (26, data), pos
+
+
+def _op27(buffer: bytes, view: memoryview, pos: int):
+    blockId, blockData = _BLOCK.unpack_from(buffer, pos)
+    data, pos = _readCommandBlockData(buffer, view, pos + 4)
+    return (27, blockId, blockData, data), pos
+
+
+def _runtimeCommandBlockReader(opcode: int, runtimeIdStruct: Struct) -> OperationReader:
+    def reader(buffer: bytes, view: memoryview, pos: int):
+        (runtimeId,) = runtimeIdStruct.unpack_from(buffer, pos)
+        data, pos = _readCommandBlockData(buffer, view, pos + runtimeIdStruct.size)
+        return (opcode, runtimeId, data), pos
+
+    return reader
+
+
+def _op36(buffer: bytes, view: memoryview, pos: int):
+    (blockData,) = _UINT16.unpack_from(buffer, pos)
+    data, pos = _readCommandBlockData(buffer, view, pos + 2)
+    return (36, blockData, data), pos
+
+
+def _runtimeChestReader(opcode: int, runtimeIdStruct: Struct) -> OperationReader:
+    def reader(buffer: bytes, view: memoryview, pos: int):
+        (runtimeId,) = runtimeIdStruct.unpack_from(buffer, pos)
+        pos += runtimeIdStruct.size
+        (slotCount,) = _UINT8.unpack_from(buffer, pos)
+        slots, pos = _readChestSlots(buffer, view, pos + 1, slotCount)
+        return (opcode, runtimeId, slots), pos
+
+    return reader
+
+
+def _op39(buffer: bytes, view: memoryview, pos: int):
+    (length,) = _UINT32.unpack_from(buffer, pos)
+    pos += 4
+    if pos + length > len(buffer):
+        raise EOFError
+    return (39, bytes(view[pos : pos + length])), pos + length
+
+
+def _op40(buffer: bytes, view: memoryview, pos: int):
+    blockId, blockData, slotCount = _CHEST_HEAD.unpack_from(buffer, pos)
+    slots, pos = _readChestSlots(buffer, view, pos + _CHEST_HEAD.size, slotCount)
+    return (40, blockId, blockData, slots), pos
+
+
+# operation number -> struct of the fixed size payload
+FIXED_OPERATIONS: dict[int, Struct] = {
+    5: _BLOCK,
+    6: Struct(">H"),
+    7: _BLOCK,
+    8: Struct(""),
+    9: Struct(""),
+    12: Struct(">I"),
+    14: Struct(""),
+    15: Struct(""),
+    16: Struct(""),
+    17: Struct(""),
+    18: Struct(""),
+    19: Struct(""),
+    20: Struct(">h"),
+    21: Struct(">i"),
+    22: Struct(">h"),
+    23: Struct(">i"),
+    24: Struct(">h"),
+    25: Struct(">i"),
+    28: Struct(">b"),
+    29: Struct(">b"),
+    30: Struct(">b"),
+    31: Struct(">B"),
+    32: Struct(">H"),
+    33: Struct(">I"),
+    41: Struct(""),
+}
+
+# operation number -> reader of the variable size payload
+VARIABLE_OPERATIONS: dict[int, OperationReader] = {
+    1: _op1,
+    13: _op13,
+    26: _op26,
+    27: _op27,
+    34: _runtimeCommandBlockReader(34, _UINT16),
+    35: _runtimeCommandBlockReader(35, _UINT32),
+    36: _op36,
+    37: _runtimeChestReader(37, _UINT16),
+    38: _runtimeChestReader(38, _UINT32),
+    39: _op39,
+    40: _op40,
+}
+
+_FIXED_DISPATCH: dict[int, tuple[Callable, int]] = {
+    opcode: (struct.unpack_from, struct.size)
+    for opcode, struct in FIXED_OPERATIONS.items()
+}
+
+
+class OperationStream:
+    """
+    Iterable over the operations in buffer:bytes starting at offset:int,
+    which keeps track of how far the decoding has gone
+
+    `position: int`
+        Offset of the next undecoded byte
+    """
+
+    def __init__(self, buffer: bytes, offset: int = 0) -> None:
+        self.buffer = buffer
+        self.offset = offset
+        self.position = offset
+
+    @property
+    def progress(self) -> float:
+        """
+        Decoded fraction of the operation stream, between 0 and 1
+        """
+        total = len(self.buffer) - self.offset
+        if total <= 0:
+            return 1.0
+        return min((self.position - self.offset) / total, 1.0)
+
+    def __iter__(self) -> Iterator[OperationRecord]:
+        buffer = self.buffer
+        view = memoryview(buffer)
+        fixedDispatch = _FIXED_DISPATCH
+        variableDispatch = VARIABLE_OPERATIONS
+        bufferLength = len(buffer)
+        pos = self.position
+        try:
+            while True:
+                if pos >= bufferLength:
+                    raise EOFError
+                opcode = buffer[pos]
+                pos += 1
+                fixed = fixedDispatch.get(opcode)
+                if fixed is not None:
+                    unpack_from, size = fixed
+                    record = (opcode, *unpack_from(buffer, pos))
+                    pos += size
+                elif opcode == 88:
+                    self.position = pos
+                    return
+                else:
+                    reader = variableDispatch.get(opcode)
+                    if reader is None:
+                        raise UnknownOperationError(opcode, pos - 1)
+                    record, pos = reader(buffer, view, pos)
+                self.position = pos
+                yield record
+        except StructError:
+            raise EOFError
+
+
+def DecodeOperations(buffer: bytes, offset: int = 0) -> Iterator[OperationRecord]:
+    """
+    Decode the operations in buffer:bytes starting at offset:int,
+    until the terminating operation 88 is met
+    """
+    return iter(OperationStream(buffer, offset))
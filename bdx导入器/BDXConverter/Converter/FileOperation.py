@@ -1,6 +1,8 @@
 from .Converter import BDX, BDX_2
+from .Streaming import BDXWriter
+from ..General.GeneralClass import GeneralClass
 from json import loads, dumps
-from io import BytesIO
+from collections.abc import Callable, Iterable
 from typing import TypeVar
 
 BDX_TYPE = TypeVar("BDX_TYPE", BDX, BDX_2)
@@ -21,17 +23,31 @@ def ReadBDXFile(path: str, bdx_cls: type[BDX_TYPE] = BDX) -> BDX_TYPE:
     # return
 
 
-def DumpStructs(BDXObj: BDX, outputPath: str) -> None:
+def DumpStructs(
+    BDXObj: BDX | BDX_2,
+    outputPath: str,
+    progress: Callable[[int, int], None] | None = None,
+) -> None:
     """
     Convert BDXObj:BDX into bytes and write it into a bdx file(outputPath:str)
     """
-    writer: BytesIO = BytesIO(b"")
-    # request a new writer
-    BDXObj.Marshal(writer)
-    # marshal
-    with open(outputPath, "w+b") as file:
-        file.write(writer.getvalue())
-    # write bytes into a bdx file
+    DumpOperations(BDXObj.BDXContents, outputPath, BDXObj.AuthorName, progress)
+    # stream the operations into the file
+
+
+def DumpOperations(
+    operations: Iterable[GeneralClass],
+    outputPath: str,
+    authorName: str = "TriM-Organization/BDXConverter",
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Stream operations:Iterable[GeneralClass] into a bdx file(outputPath:str)
+    in bounded memory, returns how many operations have been written.
+    progress is called with (operations written, bytes written)
+    """
+    with BDXWriter(outputPath, authorName, progress=progress) as writer:
+        return writer.WriteAll(operations)
 
 
 def VisualStructs(BDXObj: BDX, outputPath: str) -> None:
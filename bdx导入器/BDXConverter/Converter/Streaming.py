@@ -0,0 +1,260 @@
+import os
+from io import BytesIO
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
+from brotli import Compressor, Decompressor
+from .Decoder import OperationStream, OperationRecord
+from .ErrorClassDefine import HeaderError, UnknownOperationError
+from ..General.GeneralClass import GeneralClass
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+class BDXStream(GeneralClass):
+    def __init__(self, path: str, chunkSize: int = DEFAULT_CHUNK_SIZE) -> None:
+        """
+        Read a BDX file incrementally from disk
+
+        The file is decompressed chunk by chunk while its operations are
+        decoded, so only a bounded window of the decompressed data is kept
+        in memory no matter how large the file is.
+
+        `path: str`
+            The path of the BDX file
+        `chunkSize: int`
+            How many bytes are read (and at most decompressed) at a time
+        `AuthorName: str`
+            The author of this BDX file
+        `position: int`
+            How many bytes of the file have been read so far
+        """
+        super().__init__()
+        self.AuthorName: str = "TriM-Organization/BDXConverter"
+        self.path = path
+        self.chunkSize = chunkSize
+        self.fileSize = os.path.getsize(path)
+        self.position = 0
+        chunks = self._decompressedChunks()
+        try:
+            self._skipHeader(chunks)
+        finally:
+            chunks.close()
+
+    @property
+    def progress(self) -> float:
+        """
+        Read fraction of the file, between 0 and 1
+        """
+        if self.fileSize <= 0:
+            return 1.0
+        return min(self.position / self.fileSize, 1.0)
+
+    @property
+    def Operations(self) -> Iterator[OperationRecord]:
+        """
+        Decode the valid contents while streaming them from the file,
+        see `Decoder` for the layout of each record
+        """
+        return self._iterOperations()
+
+    def _decompressedChunks(self) -> Iterator[bytes]:
+        with open(self.path, "rb") as file:
+            outsideHeader = file.read(3)
+            if outsideHeader != b"BD@":
+                raise HeaderError(outsideHeader)
+            # check outside header
+            decompressor = Decompressor()
+            limited = hasattr(decompressor, "can_accept_more_data")
+            # older brotli releases can't bound the output of a single call
+            while True:
+                if limited and not decompressor.can_accept_more_data():
+                    data = decompressor.process(
+                        b"", output_buffer_limit=self.chunkSize
+                    )
+                else:
+                    chunk = file.read(self.chunkSize)
+                    if not chunk and (not limited or decompressor.is_finished()):
+                        return
+                    self.position = file.tell()
+                    if limited:
+                        data = decompressor.process(
+                            chunk, output_buffer_limit=self.chunkSize
+                        )
+                        if not (chunk or data):
+                            return
+                        # drain output still pending after the last read
+                    else:
+                        data = decompressor.process(chunk)
+                if data:
+                    yield data
+
+    def _skipHeader(self, chunks: Iterator[bytes]) -> tuple[bytes, int]:
+        buffer = b""
+        for data in chunks:
+            buffer += data
+            end = buffer.find(b"\x00", 4)
+            if end >= 0:
+                break
+        else:
+            raise EOFError
+        if buffer[:3] != b"BDX":
+            raise HeaderError(buffer[:3])
+        # check inside header
+        if buffer[3] != 0:
+            raise UnknownOperationError(buffer[3], 3)
+        self.AuthorName = buffer[4:end].decode(encoding="utf-8", errors="replace")
+        # get author's name
+        return buffer, end + 1
+
+    def _iterOperations(self) -> Iterator[OperationRecord]:
+        chunks = self._decompressedChunks()
+        buffer, pos = self._skipHeader(chunks)
+        while True:
+            segment = OperationStream(buffer, pos)
+            try:
+                yield from segment
+                return
+            except EOFError:
+                # the last operation of this window is incomplete
+                pos = segment.position
+            data = next(chunks, b"")
+            if not data:
+                raise EOFError
+            buffer = buffer[pos:] + data
+            pos = 0
+
+
+class BDXWriter(GeneralClass):
+    def __init__(
+        self,
+        path: str,
+        AuthorName: str = "TriM-Organization/BDXConverter",
+        chunkSize: int = DEFAULT_CHUNK_SIZE,
+        flushInterval: int = 0,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> None:
+        """
+        Write a BDX file incrementally to disk
+
+        Operations are marshalled into a small buffer which is handed to an
+        incremental brotli compressor whenever it grows past `chunkSize`,
+        so the memory used does not depend on the size of the build.
+        Call `Close` (or use the writer as a context manager) to terminate
+        the file.
+
+        `path: str`
+            The path of the BDX file to create
+        `AuthorName: str`
+            The author of this BDX file
+        `chunkSize: int`
+            How many uncompressed bytes are buffered before compressing them
+        `flushInterval: int`
+            When greater than 0, the compressor is flushed after about this many
+            uncompressed bytes, so that everything written so far can already
+            be decompressed from the file (at a small cost in compression ratio)
+        `progress: Callable[[int, int], None] | None`
+            Called after each chunk with the number of operations written
+            and the number of bytes written to the file so far
+        `operationCount: int`
+            How many operations have been written
+        `position: int`
+            How many bytes have been written to the file
+        """
+        super().__init__()
+        self.AuthorName = AuthorName
+        self.path = path
+        self.chunkSize = chunkSize
+        self.flushInterval = flushInterval
+        self.progress = progress
+        self.operationCount = 0
+        self.position = 0
+        self._sinceFlush = 0
+        self._compressor = Compressor()
+        self._buffer = BytesIO()
+        self._file = open(path, "w+b")
+        self._file.write(b"BD@")
+        self.position = 3
+        # outside header
+        self._buffer.write(
+            b"BDX\x00" + self.AuthorName.encode(encoding="utf-8") + b"\x00"
+        )
+        # inside header with author's name
+
+    def Write(self, operation: GeneralClass) -> None:
+        """
+        Marshal a single operation into the file
+        """
+        if "operationNumber" not in operation.__dict__:
+            return
+        self._buffer.write(
+            operation.__dict__["operationNumber"].to_bytes(
+                length=1, byteorder="big", signed=False
+            )
+        )
+        operation.Marshal(self._buffer)
+        self.operationCount += 1
+        if self._buffer.tell() >= self.chunkSize:
+            self._compressBuffer()
+
+    def WriteAll(self, operations: Iterable[GeneralClass]) -> int:
+        """
+        Marshal every operation of an iterable into the file,
+        returns how many operations have been written in total
+        """
+        for operation in operations:
+            self.Write(operation)
+        return self.operationCount
+
+    def Flush(self) -> None:
+        """
+        Compress and write everything buffered so far, ending the current
+        brotli meta-block so the written part of the file can be decoded
+        """
+        self._compressBuffer()
+        self._output(self._compressor.flush())
+        self._file.flush()
+        self._sinceFlush = 0
+
+    def Close(self) -> None:
+        """
+        Terminate the operations and finish the file
+        """
+        if self._file.closed:
+            return
+        self._buffer.write(b"XE")
+        # signature
+        self._compressBuffer()
+        self._output(self._compressor.finish())
+        self._file.close()
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(self, excType, *_) -> None:
+        if excType is not None:
+            # leave the unfinished file unterminated
+            self._file.close()
+            return
+        self.Close()
+
+    def _compressBuffer(self) -> None:
+        data = self._buffer.getvalue()
+        if not data:
+            return
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._output(self._compressor.process(data))
+        self._sinceFlush += len(data)
+        if self.flushInterval > 0 and self._sinceFlush >= self.flushInterval:
+            self._output(self._compressor.flush())
+            self._sinceFlush = 0
+        if self.progress is not None:
+            self.progress(self.operationCount, self.position)
+
+    def _output(self, data: bytes) -> None:
+        if data:
+            self._file.write(data)
+            self.position += len(data)
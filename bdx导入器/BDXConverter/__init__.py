@@ -1,4 +1,5 @@
 from .Converter.FileOperation import ReadBDXFile, DumpStructs
+from .Converter.FileOperation import DumpOperations as DumpOperations
 from .Converter.FileOperation import VisualStructs, ConvertJSONFileIntoStructs
 
 from .General.GeneralClass import GeneralClass
@@ -7,3 +8,8 @@ from .General import Operation
 from .General.Pool import GetBDXCommandPool
 
 from .Converter.Converter import BDX
+from .Converter.Decoder import DecodeOperations as DecodeOperations
+from .Converter.Decoder import OperationStream as OperationStream
+from .Converter.Decoder import CommandBlockData as CommandBlockData
+from .Converter.Streaming import BDXStream as BDXStream
+from .Converter.Streaming import BDXWriter as BDXWriter
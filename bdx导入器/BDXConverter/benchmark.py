@@ -0,0 +1,106 @@
+"""
+Benchmark of the operation decoders on a synthetic BDX file
+
+Compares `BDX_2.BDXContents`, which deep copies a template object for every
+operation, with the table-driven `BDX_2.Operations`. Run from the plugin
+directory (the optional argument is the number of operations):
+
+    python -m BDXConverter.benchmark [operationCount]
+"""
+
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from struct import pack
+from brotli import compress
+from .Converter.Converter import BDX_2
+
+DEFAULT_OPERATION_COUNT = 2_000_000
+BLOCKS = ("stone", "grass", "dirt", "planks", "glass", "wool", "concrete", "sand")
+
+
+def _commandBlockData(command: str) -> bytes:
+    return (
+        pack(">I", 2)
+        + command.encode(encoding="utf-8")
+        + b"\x00\x00\x00"
+        + pack(">I????", 0, True, True, False, False)
+    )
+
+
+def BuildFile(operationCount: int = DEFAULT_OPERATION_COUNT) -> bytes:
+    """
+    Build a BDX file with about operationCount:int operations
+
+    Every row places 62 blocks along the x axis, moves back and steps
+    along the z axis, and places a command block every 64 rows,
+    which is roughly the mix of a structure exported by PhoenixBuilder
+    """
+    header = b"".join(b"\x01" + i.encode(encoding="utf-8") + b"\x00" for i in BLOCKS)
+    row = b"".join(
+        pack(">BHH", 7, i % len(BLOCKS), i % 16) + b"\x0e" for i in range(31)
+    ) + pack(">BhBh", 20, -31, 24, 1)
+    # 31 * 2 + 2 = 64 operations
+    commandBlock = (
+        b"\x24" + pack(">H", 10) + _commandBlockData("say synthetic") + b"\x12"
+    )
+    unit = row * 64 + commandBlock
+    units = max(1, (operationCount - len(BLOCKS)) // (64 * 64 + 2))
+    contents = header + unit * units + b"XE"
+    return b"BD@" + compress(b"BDX\x00benchmark\x00" + contents, quality=1)
+
+
+def _decodeOld(data: bytes) -> int:
+    bdx = BDX_2()
+    bdx.UnMarshal(data)
+    return _count(bdx.BDXContents)
+
+
+def _decodeNew(data: bytes) -> int:
+    bdx = BDX_2()
+    bdx.UnMarshal(data)
+    return _count(bdx.Operations)
+
+
+def _count(operations: Iterable) -> int:
+    count = 0
+    for _ in operations:
+        count += 1
+    return count
+
+
+def _measure(decode: Callable[[bytes], int], data: bytes) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    count = decode(data)
+    cost = time.perf_counter() - start
+    # tracing slows the decoding down, so memory is measured in a second pass
+    tracemalloc.start()
+    try:
+        decode(data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return cost, peak, count
+
+
+def Run(
+    operationCount: int = DEFAULT_OPERATION_COUNT,
+) -> dict[str, tuple[float, int, int]]:
+    """
+    Returns {decoder: (seconds, peak traced bytes, decoded operations)}
+    """
+    data = BuildFile(operationCount)
+    return {
+        "BDXContents": _measure(_decodeOld, data),
+        "OperationStream": _measure(_decodeNew, data),
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_OPERATION_COUNT
+    for name, (cost, peak, decoded) in Run(count).items():
+        print(
+            f"{name}: {decoded} operations in {cost:.2f}s "
+            f"({decoded / cost / 1e6:.2f}M/s), peak memory {peak / 2**20:.1f} MiB"
+        )
@@ -1,23 +1,64 @@
-from tooldelta import Plugin, Print, Utils, plugins, TYPE_CHECKING, game_utils
+from tooldelta import (
+    Config,
+    Plugin,
+    Print,
+    Utils,
+    plugins,
+    TYPE_CHECKING,
+    game_utils,
+)
 import os
+import json
 import time
-from .BDXConverter.Converter.Converter import BDX_2
-from .BDXConverter import ReadBDXFile
+from array import array
+from .BDXConverter import BDXStream
+from .fill_coalescer import FillCoalescer
+from .checkpoint import CheckpointJournal, file_hash
+from .runtime_id_table import RuntimeIDTable
 
+# 导入顺序: 按 bdx 文件原始顺序 / 按区块蛇形遍历 / 按区块最近邻遍历
+ORDER_MODES = ("原始顺序", "区块蛇形", "区块最近邻")
+# 每攒够这么多个命令方块就批量放置一次
+COMMAND_BLOCK_BATCH = 256
+# 会放置方块的 bdx 操作码
+PLACE_OPERATIONS = frozenset((5, 7, 13, 26, 27, 32, 33, 34, 35, 36, 37, 38, 40))
 
 
 @plugins.add_plugin
 class BDX_BDump(Plugin):
     name = "BDX-BDump导入器"
     author = "xingchen/SuperScript"
-    version = (0, 0, 5)
+    version = (0, 0, 16)
 
     def __init__(self, frame):
         super().__init__(frame)
         self.make_data_path()
+        CFG = {
+            "导入顺序(原始顺序/区块蛇形/区块最近邻)": "原始顺序",
+            "断点保存间隔(方块数)": 10000,
+            "命令方块在途数据包上限": 32,
+        }
+        cfg, _ = Config.getPluginConfigAndVersion(
+            self.name, Config.auto_to_std(CFG), CFG, self.version
+        )
+        self.import_order = cfg["导入顺序(原始顺序/区块蛇形/区块最近邻)"]
+        if self.import_order not in ORDER_MODES:
+            Print.print_war(
+                f"未知的 bdx 导入顺序 {self.import_order}, 将使用原始顺序导入"
+            )
+            self.import_order = ORDER_MODES[0]
+        self.checkpoint_interval = max(1, int(cfg["断点保存间隔(方块数)"]))
+        self.command_block_window = max(1, int(cfg["命令方块在途数据包上限"]))
+        self.journal = CheckpointJournal(
+            os.path.join(self.data_path, "checkpoints.json")
+        )
+        # 运行时ID池的方块表: 运行时ID池/<池ID>.json
+        self.runtime_pool_path = os.path.join(self.data_path, "运行时ID池")
+        os.makedirs(self.runtime_pool_path, exist_ok=True)
+        self.runtime_tables: dict[int, RuntimeIDTable] = {}
 
     def on_def(self):
-        self.interact = plugins.get_plugin_api("前置-世界交互")
+        self.interact = plugins.get_plugin_api("前置-世界交互", (0, 0, 7))
         if TYPE_CHECKING:
             from 前置_世界交互 import GameInteractive
 
@@ -39,6 +80,12 @@ class BDX_BDump(Plugin):
         self.frame.add_console_cmd_trigger(
             ["bdx-get", "坐标bdx"], None, "获取bdx文件导入坐标", self.get_bdx_pos_menu
         )
+        self.frame.add_console_cmd_trigger(
+            ["bdump-resume", "继续导入bdx"],
+            None,
+            "从断点继续导入bdx文件",
+            self.resume_bdx_menu,
+        )
 
     def dump_bdx_menu(self, _):
         src_path = self.data_path
@@ -58,8 +105,9 @@ class BDX_BDump(Plugin):
             Print.print_err("输入错, 已退出")
             return
         bdx_file = fs[resp - 1]
+        bdx_path = os.path.join(self.data_path, bdx_file)
         try:
-            bdx_inf = self.read_bdx(os.path.join(self.data_path, bdx_file))
+            bdx_inf = self.read_bdx(bdx_path)
         except Exception as err:
             Print.print_err(f"读取 {bdx_file} 出现问题: {err}")
             return
@@ -70,7 +118,48 @@ class BDX_BDump(Plugin):
             return
         Utils.createThread(
             self.dump_bdx_at,
-            (bdx_name, bdx_inf, int(self.get_x), int(self.get_y), int(self.get_z)),
+            (
+                bdx_name,
+                bdx_path,
+                bdx_inf,
+                int(self.get_x),
+                int(self.get_y),
+                int(self.get_z),
+            ),
+        )
+
+    def resume_bdx_menu(self, _):
+        checkpoints = self.journal.load_all()
+        if not checkpoints:
+            Print.print_war("没有可继续的 bdx 导入")
+            return
+        names = list(checkpoints.keys())
+        Print.print_inf("请选择要继续导入的 bdx 文件:")
+        for i, j in enumerate(names):
+            cp = checkpoints[j]
+            Print.print_inf(
+                f" {i+1} - {j} (已放置 {cp['placed']} 个方块, 坐标 {tuple(cp['origin'])})"
+            )
+        resp = Utils.try_int(input(Print.fmt_info(f"请选择 (1~{len(names)}): ")))
+        if not resp or resp not in range(1, len(names) + 1):
+            Print.print_err("输入错, 已退出")
+            return
+        bdx_file = names[resp - 1]
+        cp = checkpoints[bdx_file]
+        bdx_path = os.path.join(self.data_path, bdx_file)
+        try:
+            if file_hash(bdx_path) != cp["hash"]:
+                Print.print_err(f"{bdx_file} 在中断后已被修改, 无法继续导入")
+                return
+            bdx_inf = self.read_bdx(bdx_path)
+        except Exception as err:
+            Print.print_err(f"读取 {bdx_file} 出现问题: {err}")
+            return
+        Print.print_inf(f"{bdx_file[:-4]} 的导入将从第 {cp['placed']} 个方块继续")
+        x, y, z = cp["origin"]
+        Utils.createThread(
+            self.dump_bdx_at,
+            (bdx_file[:-4], bdx_path, bdx_inf, x, y, z, cp["placed"], cp["order"]),
         )
 
     def get_bdx_pos_menu(self, _):
@@ -89,58 +178,191 @@ class BDX_BDump(Plugin):
         Print.print_inf(f"成功获取 {player_get} 的坐标.")
 
     def read_bdx(self, path: str):
-        return ReadBDXFile(path, BDX_2)
+        return BDXStream(path)
 
-    def dump_bdx_at(self, name: str, bdx: BDX_2, x: int, y: int, z: int):
-        BDumpOP(self, bdx, name).dump_bdx(x, y, z, 0)
+    def dump_bdx_at(
+        self,
+        name: str,
+        path: str,
+        bdx: BDXStream,
+        x: int,
+        y: int,
+        z: int,
+        skip: int = 0,
+        order: str | None = None,
+    ):
+        if not self.check_runtime_pools(bdx):
+            return
+        try:
+            BDumpOP(self, bdx, name, path, order).dump_bdx(x, y, z, skip)
+        except ValueError as err:
+            # bdx 文件内容有误, 已放置的部分保留在断点中
+            Print.print_err(f"bdx 文件 {name} 导入中止: {err}")
+            return
         Print.print_suc("bdx 导入完成")
 
-    def progress_bar(self, name: str, curr, tota, sped):
+    def check_runtime_pools(self, bdx: BDXStream) -> bool:
+        """
+        在发出任何指令前加载 bdx 开头指定的运行时ID池方块表
+
+        运行时ID池须在第一个方块放置之前指定, 因此只需读取到第一个放置操作为止.
+        """
+        pool_ids = set()
+        ops = bdx.Operations
+        try:
+            for op in ops:
+                if op[0] == 31:
+                    pool_ids.add(op[1])
+                elif op[0] in PLACE_OPERATIONS:
+                    break
+        finally:
+            ops.close()  # type: ignore
+        for pool_id in sorted(pool_ids):
+            try:
+                self.get_runtime_table(pool_id)
+            except (OSError, ValueError) as err:
+                Print.print_err(
+                    f"无法加载运行时ID池 {pool_id} 的方块表: {err}\n"
+                    f"请将 {pool_id}.json 放入 {self.runtime_pool_path} 后重新导入"
+                )
+                return False
+        return True
+
+    def get_runtime_table(self, pool_id: int) -> RuntimeIDTable:
+        "获取运行时ID池对应的方块表, 每个池只加载一次"
+        table = self.runtime_tables.get(pool_id)
+        if table is None:
+            table = self.runtime_tables[pool_id] = RuntimeIDTable.load(
+                self.runtime_pool_path, pool_id
+            )
+        return table
+
+    @staticmethod
+    def index_path(path: str):
+        return path + ".idx"
+
+    def read_bdx_index(self, path: str) -> int | None:
+        "读取 bdx 文件的索引, 得到方块总数; 索引不存在或已过期时返回 None"
+        try:
+            with open(self.index_path(path), encoding="utf-8") as f:
+                index = json.load(f)
+            stat = os.stat(path)
+            if index["size"] != stat.st_size or index["mtime"] != stat.st_mtime_ns:
+                return None
+            return int(index["blocks"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def write_bdx_index(self, path: str, blocks: int):
+        "在首次完整读取 bdx 文件后写入索引, 下次导入时可直接得到方块总数"
+        try:
+            stat = os.stat(path)
+            with open(self.index_path(path), "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime_ns,
+                        "blocks": blocks,
+                    },
+                    f,
+                )
+        except OSError as err:
+            Print.print_war(f"无法写入 bdx 索引文件: {err}")
+
+    def progress_bar(
+        self,
+        name: str,
+        curr,
+        tota: int | None,
+        sped,
+        ratio: float = 0.0,
+        saved: int = 0,
+    ):
         if tota == 0:
             Print.print_war("总进度为0")
             return
-        n = round(curr / tota * 30)
+        if tota is None:
+            # 方块总数未知, 以已解码的字节数估算进度
+            n = round(ratio * 30)
+            tota_text = f"约 {ratio * 100:.1f}%"
+        else:
+            n = round(curr / tota * 30)
+            tota_text = str(tota)
         p = "§b" + "|" * n + "§f" + "|" * (30 - n)
         self.game_ctrl.player_actionbar(
-            "@a", f"导入 {name} 进度: §l{curr} §7/ {tota} 速度： {sped}方块每秒 §r\n{p}"
+            "@a",
+            f"导入 {name} 进度: §l{curr} §7/ {tota_text} 速度： {sped}方块每秒 "
+            f"合并节省 {saved} 条指令 §r\n{p}",
         )
 
 
 class BDumpOP:
-    def __init__(self, f: BDX_BDump, bdx: BDX_2, name: str):
+    def __init__(
+        self,
+        f: BDX_BDump,
+        bdx: BDXStream,
+        name: str,
+        path: str,
+        order: str | None = None,
+    ):
         self.f = f
+        self.order = order or f.import_order
         self.gc = f.frame.get_game_control()
-        self.scmd = self.gc.sendwocmd
+        # 由前置-世界交互统一限速
+        self.scmd = f.interact.governor.send
         self.cache_string_pool: list[str] = []
         self._bdx = bdx
         self.name = name
+        self.path = path
+        self.bot_pos = (0, 0, 0)
+        # 按原始顺序导入时, 机器人跟随放置位置移动; 按区块导入时每个区块只传送一次
+        self.follow_bot = True
+        self.coalescer = FillCoalescer(self.send_placement)
+        # 等待批量放置的命令方块: [(命令方块更新数据包, 朝向), ...], 朝向为 None 时只更新数据
+        self.command_blocks: list[tuple[dict, int | None]] = []
 
-    def dump_bdx(self, base_x: int, base_y: int, base_z: int, delay: float = 0):
+    def move_bot(self, x: int, y: int, z: int, radius: int = 5):
+        bx, by, bz = self.bot_pos
+        if abs(x - bx) + abs(y - by) + abs(z - bz) > radius:
+            self.scmd(f"/tp @a[name={self.gc.bot_name}] {x} {y} {z}")
+            self.bot_pos = (x, y, z)
+
+    def send_placement(self, cmd: str, x: int, y: int, z: int):
+        # 合并后的区域可能已远离游标, 需确保其所在区块已加载
+        if self.follow_bot:
+            self.move_bot(x, y, z, 16)
+        self.scmd(cmd)
+
+    def iter_placements(self, base_x: int, base_y: int, base_z: int):
+        """
+        遍历 bdx 中的放置操作
+
+        Yields:
+            tuple[int, int, int, str | None, tuple | list | None]: 坐标, 方块 (setblock 中坐标之后的部分) 和附加数据.
+                普通方块的附加数据为 None;
+                容器的附加数据为物品列表 [(物品名, 数量, 数据值, 槽位), ...];
+                命令方块的方块为 None, 附加数据为 (朝向数据值, CommandBlockData);
+                只更新已有命令方块数据 (操作 26) 时朝向数据值为 None
+        """
         x = base_x
         y = base_y
         z = base_z
-        bot_x = base_x
-        bot_y = base_y
-        bot_z = base_z
-        total_len = self.get_bdx_length_2_show()
-        now_len = 0
-        now_t = 0
-        block_p = 0
-        self.scmd(f"/tp {self.f.game_ctrl.bot_name} {x} {y} {z}")
-
-        # wo/execute SkyblueSuper ~~~ fill ~~~~40~15~40 air
-        for i in self._bdx.BDXContents:
-            time.sleep(delay)
-            match i.operationNumber:
+        pool = self.cache_string_pool
+        runtime_table: RuntimeIDTable | None = None
+        for op in self._bdx.Operations:
+            match op[0]:
                 case 1:
                     # CreateConstantString
-                    self.cache_string_pool.append(i.constantString)
-                case 5 | 7 | 13:
-                    # 13 not achieved
-                    now_len += 1
-                    self.scmd(
-                        f"setblock {x} {y} {z} {self.cache_string_pool[i.blockConstantStringID]} {i.blockData}"
-                    )
+                    pool.append(op[1])
+                case 7:
+                    # PlaceBlock
+                    yield x, y, z, f"{pool[op[1]]} {op[2]}", None
+                case 5:
+                    # PlaceBlockWithBlockStates
+                    yield x, y, z, f"{pool[op[1]]} {pool[op[2]]}", None
+                case 13:
+                    # PlaceBlockWithBlockStatesDeprecated
+                    yield x, y, z, f"{pool[op[1]]} {op[2]}", None
                 case 14:
                     x += 1
                 case 15:
@@ -154,56 +376,296 @@ class BDumpOP:
                 case 19:
                     z -= 1
                 case 20 | 21 | 28:
-                    x += i.value
+                    x += op[1]
                 case 22 | 23 | 29:
-                    y += i.value
+                    y += op[1]
                 case 24 | 25 | 30:
-                    z += i.value
-                case 26 | 36 | 27:
-                    # SetCommandBlockData
-                    now_len += 1
-                    pck = self.f.interact.make_packet_command_block_update(
-                        (x, y, z),
-                        i.command,
-                        i.mode,
-                        i.needsRedstone,
-                        i.tickDelay,
-                        i.conditional,
-                        i.customName,
-                        i.trackOutput,
-                        i.executeOnFirstTick,
-                    )
-                    t = 0.2
-                    if hasattr(i, "blockData"):
-                        self.f.interact.place_command_block(pck, i.blockData, t)
-                    else:
-                        self.f.interact.place_command_block(pck, i.data, t)
-
-            if abs(x - bot_x) + abs(y - bot_y) + abs(z - bot_z) > 5:
-                self.scmd(f"/tp @a[name={self.gc.bot_name}] {x} {y} {z}")
-                bot_x = x
-                bot_y = y
-                bot_z = z
+                    z += op[1]
+                case 26:
+                    # SetCommandBlockData: 只更新当前位置已有命令方块的数据, 不重新放置
+                    yield x, y, z, None, (None, op[1])
+                case 27 | 36:
+                    # PlaceBlockWithCommandBlockData / PlaceCommandBlockWithCommandBlockData
+                    yield x, y, z, None, op[-2:]
+                case 31:
+                    # UseRuntimeIDPool
+                    runtime_table = self.f.get_runtime_table(op[1])
+                case 32 | 33:
+                    # PlaceRuntimeBlock / PlaceBlockWithRuntimeId
+                    if runtime_table is None:
+                        raise ValueError("bdx 文件在指定运行时ID池之前放置了方块")
+                    yield x, y, z, runtime_table.block(op[1]), None
+                case 34 | 35:
+                    # PlaceRuntimeBlockWithCommandBlockData
+                    if runtime_table is None:
+                        raise ValueError("bdx 文件在指定运行时ID池之前放置了方块")
+                    yield x, y, z, None, (runtime_table.get(op[1])[1], op[2])
+                case 37 | 38:
+                    # PlaceRuntimeBlockWithChestData
+                    if runtime_table is None:
+                        raise ValueError("bdx 文件在指定运行时ID池之前放置了方块")
+                    yield x, y, z, runtime_table.block(op[1]), op[2]
+                case 40:
+                    # PlaceBlockWithChestData
+                    yield x, y, z, f"{pool[op[1]]} {op[2]}", op[3]
 
-            if time.time() - now_t > 1:
-                now_t = time.time()
-                bspeed = now_len - block_p
-                block_p = now_len
-                self.f.progress_bar(self.name, now_len, total_len, bspeed)
-        # ok
-        self.f.game_ctrl.player_actionbar("@a", f"§fBDX文件 {self.name} 导入完成.")
+    def iter_placements_by_chunk(
+        self, base_x: int, base_y: int, base_z: int, skip: int = 0
+    ):
+        """
+        先将所有放置按 16x16 区块分组, 再按配置的顺序逐个区块遍历;
+        命令方块与容器在所有普通方块之后放置.
+
+        Args:
+            skip (int): 跳过前 skip 个已放置的方块, 已全部放置的区块不会传送过去
 
-    def get_bdx_length_2_show(self):
-        # not archieved
+        Returns:
+            tuple[int, Iterator]: 放置总数, 与 iter_placements 产出相同的迭代器 (不含被跳过的放置)
+        """
+        buckets: dict[tuple[int, int], array] = {}
+        cb_buckets: dict[tuple[int, int], list] = {}
+        palette: dict[str, int] = {}
+        blocks: list[str] = []
         count = 0
         t = time.time()
-        for i in self._bdx.BDXContents:
-            if i.operationNumber in (5, 7, 13, 26, 36, 27):
-                count += 1
-            del i
+        for x, y, z, block, extra in self.iter_placements(base_x, base_y, base_z):
+            count += 1
+            key = (x >> 4, z >> 4)
+            if extra is not None:
+                cb_buckets.setdefault(key, []).append((x, y, z, block, extra))
+            else:
+                block_id = palette.get(block)
+                if block_id is None:
+                    block_id = palette[block] = len(blocks)
+                    blocks.append(block)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = array("i")
+                bucket.extend((x, y, z, block_id))
             if time.time() - t > 0.5:
                 self.gc.player_actionbar(
-                    "@a", f"§f正在计算 {self.name} 的方块总数 ({count})"
+                    "@a",
+                    f"§f正在按区块整理 {self.name} ({count}, 约 {self._bdx.progress:.1%})",
                 )
                 t = time.time()
-        return count
+        return count, self._walk_chunks(buckets, cb_buckets, blocks, skip)
+
+    def _walk_chunks(
+        self,
+        buckets: dict[tuple[int, int], array],
+        cb_buckets: dict[tuple[int, int], list],
+        blocks: list[str],
+        skip: int = 0,
+    ):
+        for key in self.chunk_order(buckets):
+            bucket = buckets.pop(key)
+            if len(bucket) // 4 <= skip:
+                # 整个区块都已放置
+                skip -= len(bucket) // 4
+                continue
+            # 先发出上一区块的缓存放置, 再传送到下一区块
+            self.coalescer.flush()
+            entries = sorted(
+                range(0, len(bucket), 4),
+                key=lambda i: (bucket[i + 1], bucket[i + 2], bucket[i]),
+            )[skip:]
+            skip = 0
+            self.enter_chunk(key, bucket[entries[0] + 1])
+            for i in entries:
+                x, y, z, block_id = bucket[i : i + 4]
+                yield x, y, z, blocks[block_id], None
+        self.coalescer.flush()
+        for key in self.chunk_order(cb_buckets):
+            bucket = cb_buckets.pop(key)
+            if len(bucket) <= skip:
+                skip -= len(bucket)
+                continue
+            bucket = bucket[skip:]
+            skip = 0
+            # 容器的物品与命令方块同样需要所在区块已加载
+            self.enter_chunk(key, bucket[0][1])
+            yield from bucket
+
+    def enter_chunk(self, key: tuple[int, int], y: int):
+        "传送到区块中心"
+        cx, cz = key
+        self.bot_pos = (cx * 16 + 8, y, cz * 16 + 8)
+        self.scmd(f"/tp @a[name={self.gc.bot_name}] {cx * 16 + 8} {y} {cz * 16 + 8}")
+
+    def chunk_order(self, keys) -> list[tuple[int, int]]:
+        if self.order == "区块最近邻":
+            return self.nearest_order(keys)
+        return self.serpentine_order(keys)
+
+    @staticmethod
+    def serpentine_order(keys) -> list[tuple[int, int]]:
+        "按 x 逐列遍历区块, 相邻两列的 z 方向相反"
+        columns: dict[int, list[int]] = {}
+        for cx, cz in keys:
+            columns.setdefault(cx, []).append(cz)
+        order = []
+        for n, cx in enumerate(sorted(columns)):
+            order.extend((cx, cz) for cz in sorted(columns[cx], reverse=n % 2 == 1))
+        return order
+
+    @staticmethod
+    def nearest_order(keys) -> list[tuple[int, int]]:
+        "从最小的区块出发, 每次前往最近的未访问区块"
+        remaining = set(keys)
+        if not remaining:
+            return []
+        current = min(remaining)
+        remaining.remove(current)
+        order = [current]
+        while remaining:
+            cx, cz = current
+            best = None
+            r = 1
+            while best is None:
+                if 8 * r > len(remaining):
+                    # 剩余区块较少时直接比较
+                    best = min(
+                        remaining, key=lambda k: (k[0] - cx) ** 2 + (k[1] - cz) ** 2
+                    )
+                    break
+                best_dist = None
+                for dx in range(-r, r + 1):
+                    for dz in (-r, r) if abs(dx) != r else range(-r, r + 1):
+                        key = (cx + dx, cz + dz)
+                        if key in remaining and (
+                            best_dist is None or dx * dx + dz * dz < best_dist
+                        ):
+                            best, best_dist = key, dx * dx + dz * dz
+                r += 1
+            remaining.remove(best)
+            order.append(best)
+            current = best
+        return order
+
+    def queue_command_block(self, x: int, y: int, z: int, cb: tuple):
+        "将命令方块加入批量放置队列, 攒够 COMMAND_BLOCK_BATCH 个后统一放置"
+        facing, i = cb
+        pck = self.f.interact.make_packet_command_block_update(
+            (x, y, z),
+            i.command,
+            i.mode,
+            i.needsRedstone,
+            i.tickDelay,
+            i.conditional,
+            i.customName,
+            i.trackOutput,
+            i.executeOnFirstTick,
+        )
+        self.command_blocks.append((pck, facing))
+        if len(self.command_blocks) >= COMMAND_BLOCK_BATCH:
+            self.flush_command_blocks()
+
+    def flush_command_blocks(self):
+        if not self.command_blocks:
+            return
+        # 命令方块可能依赖此前放置的方块, 先发出缓存的放置
+        self.coalescer.flush()
+        self.f.interact.place_command_blocks(
+            self.command_blocks, self.f.command_block_window
+        )
+        self.bot_pos = tuple(self.command_blocks[-1][0]["Position"])
+        self.command_blocks = []
+
+    def fill_container(self, x: int, y: int, z: int, slots: list):
+        "一次性发出一个容器内所有物品的 replaceitem 指令"
+        for item_name, count, data, slot_id in slots:
+            self.scmd(
+                f"replaceitem block {x} {y} {z} slot.container {slot_id} {item_name} {count} {data}"
+            )
+
+    def save_checkpoint(self, origin: tuple[int, int, int], placed: int):
+        self.f.journal.save(
+            os.path.basename(self.path),
+            {
+                "hash": self.file_hash,
+                "origin": list(origin),
+                "order": self.order,
+                "placed": placed,
+            },
+        )
+
+    def dump_bdx(
+        self,
+        base_x: int,
+        base_y: int,
+        base_z: int,
+        skip: int = 0,
+    ):
+        """
+        导入 bdx
+
+        Args:
+            base_x, base_y, base_z (int): 导入坐标
+            skip (int): 跳过前 skip 个已放置的方块 (从断点继续)
+        """
+        coalescer = self.coalescer
+        origin = (base_x, base_y, base_z)
+        checkpoint_interval = self.f.checkpoint_interval
+        self.file_hash = file_hash(self.path)
+        self.save_checkpoint(origin, skip)
+        index_len = total_len = self.f.read_bdx_index(self.path)
+        now_len = 0
+        now_t = 0
+        block_p = 0
+        self.bot_pos = (base_x, base_y, base_z)
+        self.scmd(f"/tp {self.f.game_ctrl.bot_name} {base_x} {base_y} {base_z}")
+        if self.order == ORDER_MODES[0]:
+            placements = self.iter_placements(base_x, base_y, base_z)
+        else:
+            self.follow_bot = False
+            total_len, placements = self.iter_placements_by_chunk(
+                base_x, base_y, base_z, skip
+            )
+            # 已放置的部分在遍历区块时整块跳过, 不再产出
+            now_len, skip = skip, 0
+
+        # wo/execute SkyblueSuper ~~~ fill ~~~~40~15~40 air
+        for x, y, z, block, extra in placements:
+            now_len += 1
+            if now_len <= skip:
+                continue
+            if block is None:
+                self.queue_command_block(x, y, z, extra)
+            else:
+                coalescer.add(x, y, z, block)
+                if extra is not None:
+                    # 容器须先放置出来才能填充物品
+                    coalescer.flush()
+                    self.fill_container(x, y, z, extra)
+            if self.follow_bot:
+                self.move_bot(x, y, z)
+            if now_len % checkpoint_interval == 0:
+                # 断点只记录已经发出的放置
+                self.flush_command_blocks()
+                coalescer.flush()
+                self.save_checkpoint(origin, now_len)
+
+            if time.time() - now_t > 1:
+                now_t = time.time()
+                bspeed = now_len - block_p
+                block_p = now_len
+                self.f.progress_bar(
+                    self.name,
+                    now_len,
+                    total_len,
+                    bspeed,
+                    self._bdx.progress,
+                    coalescer.saved,
+                )
+        self.flush_command_blocks()
+        coalescer.flush()
+        # ok
+        self.f.journal.remove(os.path.basename(self.path))
+        if index_len != now_len:
+            self.f.write_bdx_index(self.path, now_len)
+        self.f.game_ctrl.player_actionbar("@a", f"§fBDX文件 {self.name} 导入完成.")
+        if coalescer.blocks:
+            Print.print_inf(
+                f"共放置 {coalescer.blocks} 个方块, 使用 {coalescer.commands} 条指令, "
+                f"合并节省 {coalescer.saved} 条 ({coalescer.saved / coalescer.blocks:.1%})"
+            )
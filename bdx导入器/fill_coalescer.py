@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from collections.abc import Callable
+
+# 单条 /fill 指令最多可填充的方块数
+FILL_VOLUME_LIMIT = 32768
+# 查找重叠矩形用的空间索引格子边长
+_CELL = 16
+
+
+def _cells(lo: list[int], hi: list[int]):
+    for cx in range(lo[0] // _CELL, hi[0] // _CELL + 1):
+        for cy in range(lo[1] // _CELL, hi[1] // _CELL + 1):
+            for cz in range(lo[2] // _CELL, hi[2] // _CELL + 1):
+                yield cx, cy, cz
+
+
+def _overlaps(rect: "_Rect", lo: list[int], hi: list[int]) -> bool:
+    return all(rect.lo[a] <= hi[a] and lo[a] <= rect.hi[a] for a in range(3))
+
+
+class _Rect:
+    __slots__ = ("block", "hi", "keys", "lo", "run_axis", "seq", "stack_axis")
+
+    def __init__(
+        self, block: str, lo: list[int], hi: list[int], run_axis: int, seq: int
+    ):
+        self.block = block
+        self.seq = seq
+        self.lo = lo
+        self.hi = hi
+        self.run_axis = run_axis
+        self.stack_axis: int | None = None
+        self.keys: list[tuple] = []
+
+    @property
+    def volume(self):
+        return (
+            (self.hi[0] - self.lo[0] + 1)
+            * (self.hi[1] - self.lo[1] + 1)
+            * (self.hi[2] - self.lo[2] + 1)
+        )
+
+
+class FillCoalescer:
+    """
+    将连续的方块放置合并为 /fill 指令
+
+    放置先被合并为沿某一坐标轴的同种方块直线段,
+    平行且相邻的等长直线段再合并为矩形, 单条指令的体积不超过 FILL_VOLUME_LIMIT.
+    未闭合的矩形最多缓存 max_pending 个, 超出时最早的矩形会被直接发出.
+    缓存中的矩形两两不重叠: 新的直线段与已缓存的矩形重叠时, 先发出被覆盖的旧矩形,
+    保证后放置的方块不会被先放置的方块覆盖, 结果与逐个 setblock 相同.
+
+    Args:
+        emit (Callable[[str, int, int, int], None]): 发送指令的回调, 参数为 (指令, 区域中心坐标 x, y, z)
+        max_pending (int): 最多缓存的未闭合矩形数
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str, int, int, int], None],
+        max_pending: int = 4096,
+    ):
+        self.emit = emit
+        self.max_pending = max_pending
+        # 收到的方块放置数与实际发出的指令数
+        self.blocks = 0
+        self.commands = 0
+        self._run_block: str | None = None
+        self._run_start = [0, 0, 0]
+        self._run_axis = -1
+        self._run_step = 0
+        self._run_length = 0
+        self._expect: dict[tuple, _Rect] = {}
+        # 按首次放置顺序排列的未闭合矩形
+        self._pending: OrderedDict[int, _Rect] = OrderedDict()
+        self._index: dict[tuple[int, int, int], set[int]] = {}
+        self._seq = 0
+
+    @property
+    def saved(self):
+        "已节省的指令数"
+        return self.blocks - self.commands
+
+    def add(self, x: int, y: int, z: int, block: str):
+        """
+        放置一个方块
+
+        Args:
+            x, y, z (int): 坐标
+            block (str): setblock 指令中坐标之后的部分, 如 "stone 0"
+        """
+        self.blocks += 1
+        if block == self._run_block and self._run_length < FILL_VOLUME_LIMIT:
+            sx, sy, sz = self._run_start
+            if self._run_length == 1:
+                dx, dy, dz = x - sx, y - sy, z - sz
+                if abs(dx) + abs(dy) + abs(dz) == 1:
+                    self._run_axis = 0 if dx else (1 if dy else 2)
+                    self._run_step = dx or dy or dz
+                    self._run_length = 2
+                    return
+            else:
+                expected = [sx, sy, sz]
+                expected[self._run_axis] += self._run_step * self._run_length
+                if expected[0] == x and expected[1] == y and expected[2] == z:
+                    self._run_length += 1
+                    return
+        self._flush_run()
+        self._run_block = block
+        self._run_start = [x, y, z]
+        self._run_axis = -1
+        self._run_step = 0
+        self._run_length = 1
+
+    def flush(self):
+        "发出所有已缓存的放置"
+        self._flush_run()
+        while self._pending:
+            self._emit_rect(next(iter(self._pending.values())))
+
+    def _flush_run(self):
+        if self._run_block is None:
+            return
+        lo = self._run_start.copy()
+        hi = self._run_start.copy()
+        axis = self._run_axis
+        if axis < 0:
+            # 单个方块, 视为沿 x 轴的直线段
+            axis = 0
+        else:
+            end = lo[axis] + self._run_step * (self._run_length - 1)
+            lo[axis], hi[axis] = min(lo[axis], end), max(lo[axis], end)
+        block = self._run_block
+        self._run_block = None
+        length = hi[axis] - lo[axis] + 1
+        rect = self._expect.get((block, axis, length, *lo))
+        if rect is not None and rect.volume + length > FILL_VOLUME_LIMIT:
+            rect = None
+        self._emit_overlapping(lo, hi)
+        if rect is not None and id(rect) in self._pending:
+            self._extend_rect(rect, lo, hi)
+            return
+        self._seq += 1
+        rect = _Rect(block, lo, hi, axis, self._seq)
+        self._register(rect)
+        self._pending[id(rect)] = rect
+        self._add_index(rect, lo, hi)
+        if len(self._pending) > self.max_pending:
+            self._emit_rect(next(iter(self._pending.values())))
+
+    def _emit_overlapping(self, lo: list[int], hi: list[int]):
+        "发出与区域重叠的已缓存矩形"
+        found = {}
+        for cell in _cells(lo, hi):
+            for rid in self._index.get(cell, ()):
+                rect = self._pending[rid]
+                if _overlaps(rect, lo, hi):
+                    found[rid] = rect
+        for rect in sorted(found.values(), key=lambda r: r.seq):
+            self._emit_rect(rect)
+
+    def _add_index(self, rect: _Rect, lo: list[int], hi: list[int]):
+        for cell in _cells(lo, hi):
+            self._index.setdefault(cell, set()).add(id(rect))
+
+    def _extend_rect(self, rect: _Rect, lo: list[int], hi: list[int]):
+        if lo[0] < rect.lo[0] or lo[1] < rect.lo[1] or lo[2] < rect.lo[2]:
+            stack_axis = next(a for a in range(3) if lo[a] < rect.lo[a])
+            rect.lo[stack_axis] = lo[stack_axis]
+        else:
+            stack_axis = next(a for a in range(3) if hi[a] > rect.hi[a])
+            rect.hi[stack_axis] = hi[stack_axis]
+        rect.stack_axis = stack_axis
+        self._unregister(rect)
+        self._register(rect)
+        self._add_index(rect, lo, hi)
+
+    def _register(self, rect: _Rect):
+        length = rect.hi[rect.run_axis] - rect.lo[rect.run_axis] + 1
+        for axis in range(3):
+            if axis == rect.run_axis:
+                continue
+            if rect.stack_axis is not None and axis != rect.stack_axis:
+                continue
+            if rect.stack_axis is None and rect.hi[axis] != rect.lo[axis]:
+                continue
+            for nxt in (rect.hi[axis] + 1, rect.lo[axis] - 1):
+                start = rect.lo.copy()
+                start[axis] = nxt
+                key = (rect.block, rect.run_axis, length, *start)
+                self._expect[key] = rect
+                rect.keys.append(key)
+
+    def _unregister(self, rect: _Rect):
+        for key in rect.keys:
+            if self._expect.get(key) is rect:
+                del self._expect[key]
+        rect.keys.clear()
+
+    def _emit_rect(self, rect: _Rect):
+        del self._pending[id(rect)]
+        self._unregister(rect)
+        for cell in _cells(rect.lo, rect.hi):
+            ids = self._index.get(cell)
+            if ids is not None:
+                ids.discard(id(rect))
+                if not ids:
+                    del self._index[cell]
+        lx, ly, lz = rect.lo
+        hx, hy, hz = rect.hi
+        if rect.lo == rect.hi:
+            cmd = f"setblock {lx} {ly} {lz} {rect.block}"
+        else:
+            cmd = f"fill {lx} {ly} {lz} {hx} {hy} {hz} {rect.block}"
+        self.commands += 1
+        self.emit(cmd, (lx + hx) // 2, (ly + hy) // 2, (lz + hz) // 2)
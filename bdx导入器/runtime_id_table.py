@@ -0,0 +1,111 @@
+import json
+import os
+import struct
+from array import array
+
+# 二进制表文件头: 魔数, 运行时ID数量, 方块名数量, 方块名区长度
+_HEADER = struct.Struct("<4sIII")
+_MAGIC = b"RTID"
+
+
+class RuntimeIDTable:
+    """
+    运行时ID -> (方块名, 数据值) 的查找表
+
+    表以两个 uint16 数组 (方块名序号, 数据值) 保存,
+    首次使用时由 <池ID>.json 编译为 <池ID>.rtid 二进制文件, 之后直接读取二进制文件.
+    <池ID>.json 的内容为以运行时ID为下标的列表, 每项为 [方块名, 数据值].
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        name_ids: array,
+        datas: array,
+        pool_id: int | None = None,
+    ):
+        self.names = names
+        self.name_ids = name_ids
+        self.datas = datas
+        self.pool_id = pool_id
+        # 按需生成的 "方块名 数据值" 字符串
+        self._blocks: list[str | None] = [None] * len(name_ids)
+
+    def __len__(self):
+        return len(self.name_ids)
+
+    def get(self, runtime_id: int) -> tuple[str, int]:
+        self._check(runtime_id)
+        return self.names[self.name_ids[runtime_id]], self.datas[runtime_id]
+
+    def block(self, runtime_id: int) -> str:
+        "返回 setblock 指令中坐标之后的部分, 如 stone 0"
+        self._check(runtime_id)
+        block = self._blocks[runtime_id]
+        if block is None:
+            name, data = self.get(runtime_id)
+            block = self._blocks[runtime_id] = f"{name} {data}"
+        return block
+
+    def _check(self, runtime_id: int):
+        if not 0 <= runtime_id < len(self.name_ids):
+            raise ValueError(
+                f"运行时ID {runtime_id} 超出运行时ID池 {self.pool_id} 的范围 "
+                f"(0~{len(self.name_ids) - 1}), 文件可能已损坏或使用了其他运行时ID池"
+            )
+
+    @classmethod
+    def load(cls, directory: str, pool_id: int) -> "RuntimeIDTable":
+        json_path = os.path.join(directory, f"{pool_id}.json")
+        bin_path = os.path.join(directory, f"{pool_id}.rtid")
+        if os.path.isfile(bin_path) and (
+            not os.path.isfile(json_path)
+            or os.path.getmtime(bin_path) >= os.path.getmtime(json_path)
+        ):
+            table = cls.read_binary(bin_path)
+            table.pool_id = pool_id
+            return table
+        if not os.path.isfile(json_path):
+            raise FileNotFoundError(f"找不到运行时ID池 {pool_id} 的方块表: {json_path}")
+        with open(json_path, encoding="utf-8") as f:
+            table = cls.from_list(json.load(f))
+        table.pool_id = pool_id
+        table.write_binary(bin_path)
+        return table
+
+    @classmethod
+    def from_list(cls, entries: list) -> "RuntimeIDTable":
+        names: list[str] = []
+        name_index: dict[str, int] = {}
+        name_ids = array("H")
+        datas = array("H")
+        for name, data in entries:
+            if name not in name_index:
+                name_index[name] = len(names)
+                names.append(name)
+            name_ids.append(name_index[name])
+            datas.append(data)
+        return cls(names, name_ids, datas)
+
+    @classmethod
+    def read_binary(cls, path: str) -> "RuntimeIDTable":
+        with open(path, "rb") as f:
+            magic, count, name_count, names_len = _HEADER.unpack(
+                f.read(_HEADER.size)
+            )
+            if magic != _MAGIC:
+                raise ValueError(f"不是运行时ID表文件: {path}")
+            names = f.read(names_len).decode("utf-8").split("\0")[:name_count]
+            name_ids = array("H")
+            name_ids.fromfile(f, count)
+            datas = array("H")
+            datas.fromfile(f, count)
+        return cls(names, name_ids, datas)
+
+    def write_binary(self, path: str):
+        names = "\0".join(self.names).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(self), len(self.names), len(names)))
+            f.write(names)
+            self.name_ids.tofile(f)
+            self.datas.tofile(f)
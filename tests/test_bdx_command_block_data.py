@@ -0,0 +1,110 @@
+import importlib.util
+import struct
+import sys
+import types
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+
+def load_package(monkeypatch, name: str, directory: str):
+    "按路径加载插件包, 插件包内使用相对导入"
+    spec = importlib.util.spec_from_file_location(
+        name,
+        ROOT / directory / "__init__.py",
+        submodule_search_locations=[str(ROOT / directory)],
+    )
+    module = importlib.util.module_from_spec(spec)  # type: ignore
+    monkeypatch.setitem(sys.modules, name, module)
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+@pytest.fixture
+def plugins(monkeypatch):
+    "在测试环境中提供插件框架的最小替身, 返回 (bdx导入器, 前置-世界交互)"
+    tooldelta = types.ModuleType("tooldelta")
+    tooldelta.__dict__.update(
+        Config=None,
+        Frame=object,
+        Plugin=object,
+        Print=None,
+        Utils=None,
+        TYPE_CHECKING=False,
+        game_utils=None,
+        plugins=SimpleNamespace(
+            add_plugin=lambda cls: cls,
+            add_plugin_as_api=lambda name: lambda cls: cls,
+            checkSystemVersion=lambda version: None,
+        ),
+    )
+    monkeypatch.setitem(sys.modules, "tooldelta", tooldelta)
+    return (
+        load_package(monkeypatch, "bdx_importer", "bdx导入器"),
+        load_package(monkeypatch, "world_interact", "前置_世界交互"),
+    )
+
+
+class FakeGameControl:
+    bot_name = "bot"
+
+    def __init__(self):
+        self.cmds: list[str] = []
+        self.packets: list[dict] = []
+
+    def sendwocmd(self, cmd: str):
+        self.cmds.append(cmd)
+
+    def sendcmd_with_resp(self, cmd: str, timeout: float = 5):
+        return None
+
+    def sendPacket(self, pkt_id: int, pkt: dict):
+        self.packets.append(pkt)
+
+
+def command_block_data(command: str, mode: int, conditional: bool) -> bytes:
+    "按 bdx 格式编码 CommandBlockData"
+    return (
+        struct.pack(">I", mode)
+        + command.encode()
+        + b"\x00\x00\x00"
+        + struct.pack(">I????", 0, True, True, conditional, False)
+    )
+
+
+def test_set_command_block_data_keeps_block(plugins):
+    bdx_importer, world_interact = plugins
+    # 36: 放置朝向 2 且为条件模式 (数据值 2 | 8) 的连锁命令方块; 26: 之后更新其指令
+    buffer = (
+        b"\x24"
+        + struct.pack(">H", 10)
+        + command_block_data("say a", 2, True)
+        + b"\x1a"
+        + command_block_data("say b", 2, True)
+        + b"X"
+    )
+    gc = FakeGameControl()
+    interact = world_interact.GameInteractive.__new__(world_interact.GameInteractive)
+    interact.game_ctrl = gc
+    interact.governor = SimpleNamespace(send=gc.sendwocmd, acquire=lambda: None)
+    f = SimpleNamespace(
+        frame=SimpleNamespace(get_game_control=lambda: gc),
+        interact=interact,
+        import_order=bdx_importer.ORDER_MODES[0],
+        command_block_window=32,
+    )
+    bdx = SimpleNamespace(Operations=bdx_importer.BDXConverter.OperationStream(buffer))
+    op = bdx_importer.BDumpOP(f, bdx, "test", "test.bdx")  # type: ignore
+    for x, y, z, block, extra in op.iter_placements(0, 0, 0):
+        assert block is None
+        op.queue_command_block(x, y, z, extra)
+    op.flush_command_blocks()
+
+    setblocks = [cmd for cmd in gc.cmds if cmd.startswith("/setblock")]
+    assert setblocks == ["/setblock 0 0 0 chain_command_block 10"]
+    assert [pkt["Command"] for pkt in gc.packets] == ["say a", "say b"]
+    assert gc.packets[-1]["Conditional"] is True
+    assert gc.packets[-1]["Mode"] == 2
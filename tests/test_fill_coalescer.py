@@ -0,0 +1,85 @@
+import importlib.util
+import itertools
+import random
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location(
+    "fill_coalescer",
+    Path(__file__).parent.parent / "bdx导入器" / "fill_coalescer.py",
+)
+fill_coalescer = importlib.util.module_from_spec(_spec)  # type: ignore
+_spec.loader.exec_module(fill_coalescer)  # type: ignore
+
+
+def apply(world: dict, cmd: str):
+    "在模拟世界中执行 setblock / fill 指令"
+    name, *args = cmd.split()
+    if name == "setblock":
+        x, y, z = map(int, args[:3])
+        world[(x, y, z)] = " ".join(args[3:])
+        return
+    lx, ly, lz, hx, hy, hz = map(int, args[:6])
+    block = " ".join(args[6:])
+    for pos in itertools.product(
+        range(lx, hx + 1), range(ly, hy + 1), range(lz, hz + 1)
+    ):
+        world[pos] = block
+
+
+def place(placements, **kwargs) -> tuple[dict, dict]:
+    "返回 (逐个 setblock 的结果, 合并为 fill 后的结果)"
+    expected = {}
+    for x, y, z, block in placements:
+        apply(expected, f"setblock {x} {y} {z} {block}")
+    world = {}
+    coalescer = fill_coalescer.FillCoalescer(
+        lambda cmd, *_: apply(world, cmd), **kwargs
+    )
+    for placement in placements:
+        coalescer.add(*placement)
+    coalescer.flush()
+    return expected, world
+
+
+def test_overwrite_pending_rect():
+    placements = [
+        (0, 0, 0, "stone 0"),
+        (1, 0, 0, "stone 0"),
+        (0, 0, 0, "dirt 0"),
+        (0, 1, 0, "stone 0"),
+        (1, 1, 0, "stone 0"),
+    ]
+    expected, world = place(placements)
+    assert world == expected
+    assert world[(0, 0, 0)] == "dirt 0"
+
+
+def test_merges_layers():
+    placements = [
+        (x, y, z, "stone 0") for y in range(4) for z in range(8) for x in range(8)
+    ]
+    world = {}
+    coalescer = fill_coalescer.FillCoalescer(lambda cmd, *_: apply(world, cmd))
+    for placement in placements:
+        coalescer.add(*placement)
+    coalescer.flush()
+    # 每层合并为一个矩形
+    assert coalescer.commands == 4
+    assert len(world) == 256
+
+
+def test_random_overwrites_match_setblock():
+    rng = random.Random(0)
+    for max_pending in (4, 4096):
+        placements = []
+        for _ in range(500):
+            # 先铺一段直线, 再随机覆盖, 制造大量重叠
+            x, y, z = rng.randrange(4), rng.randrange(2), rng.randrange(4)
+            block = rng.choice(("stone 0", "dirt 0"))
+            axis = rng.randrange(3)
+            for i in range(rng.randrange(1, 6)):
+                pos = [x, y, z]
+                pos[axis] += i
+                placements.append((*pos, block))
+        expected, world = place(placements, max_pending=max_pending)
+        assert world == expected
@@ -0,0 +1,38 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "runtime_id_table",
+    Path(__file__).parent.parent / "bdx导入器" / "runtime_id_table.py",
+)
+runtime_id_table = importlib.util.module_from_spec(_spec)  # type: ignore
+_spec.loader.exec_module(runtime_id_table)  # type: ignore
+
+
+def make_table(tmp_path: Path):
+    (tmp_path / "117.json").write_text(
+        json.dumps([["stone", 0], ["chest", 2]]), encoding="utf-8"
+    )
+    return runtime_id_table.RuntimeIDTable.load(str(tmp_path), 117)
+
+
+def test_lookup(tmp_path):
+    table = make_table(tmp_path)
+    assert table.block(0) == "stone 0"
+    assert table.get(1) == ("chest", 2)
+    # 第二次读取编译好的二进制表
+    table = runtime_id_table.RuntimeIDTable.load(str(tmp_path), 117)
+    assert table.pool_id == 117
+    assert table.block(1) == "chest 2"
+
+
+@pytest.mark.parametrize("runtime_id", [2, 65535, -1])
+def test_out_of_range(tmp_path, runtime_id):
+    table = make_table(tmp_path)
+    with pytest.raises(ValueError, match=f"运行时ID {runtime_id} .*运行时ID池 117"):
+        table.block(runtime_id)
+    with pytest.raises(ValueError, match="运行时ID池 117"):
+        table.get(runtime_id)
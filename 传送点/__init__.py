@@ -1,7 +1,7 @@
 import anyio
 import ujson as json
 import os
-from tooldelta.game_utils import getPos, getTarget
+from tooldelta.game_utils import getTarget
 from tooldelta.plugin_load.injected_plugin import player_message, player_message_info
 from tooldelta.game_utils import tellrawText
 from 维度传送 import tp
@@ -11,10 +11,13 @@ from tooldelta.frame import Config
 
 __plugin_meta__ = {
     "name": "传送点",
-    "version": "0.0.2",
+    "version": "0.0.3",
     "author": "wling/7912",
 }
 
+# 坐标请求经由基本插件功能库合并为 querytarget @a
+getPos = plugins.get_plugin_api("基本插件功能库", (0, 0, 12)).getPos
+
 STD_HOME_MAX_NUM = {"最大传送点数量": int}
 DEFAULT_BAN_CFG = {
     "最大传送点数量": 3,
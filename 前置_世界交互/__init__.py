@@ -1,5 +1,6 @@
-from tooldelta import plugins, Frame, Plugin
+from tooldelta import plugins, Config, Frame, Plugin
 import time
+from .rate_governor import RateGovernor
 
 plugins.checkSystemVersion((0, 3, 20))
 
@@ -10,11 +11,21 @@ class GameInteractive(Plugin):
     name = "前置-世界交互"
     author = "SuperScript"
     description = "前置插件, 提供世界交互功能的数据包, etc."
-    version = (0, 0, 4)
+    version = (0, 0, 7)
 
     def __init__(self, frame: Frame):
         self.frame = frame
         self.game_ctrl = frame.get_game_control()
+        CFG = {"指令速率(条每秒)": 1000, "根据延迟自动调节速率": True}
+        cfg, _ = Config.getPluginConfigAndVersion(
+            self.name, Config.auto_to_std(CFG), CFG, self.version
+        )
+        # 所有建造类插件共用的指令限速器, 使用 api.governor.send(指令) 限速发送
+        self.governor = RateGovernor(
+            self.game_ctrl,
+            cfg["指令速率(条每秒)"],
+            auto_adjust=cfg["根据延迟自动调节速率"],
+        )
 
     @staticmethod
     def make_packet_command_block_update(
@@ -44,10 +55,10 @@ class GameInteractive(Plugin):
         }
         return myPacket
 
-    def place_command_block(
-        self, command_block_update_packet, facing=0, limit_seconds=0.5
-    ):
-        cmd = (
+    @staticmethod
+    def make_command_block_setblock(command_block_update_packet, facing=0):
+        "生成放置命令方块外壳的 setblock 指令"
+        return (
             "/setblock "
             + " ".join([str(i) for i in command_block_update_packet["Position"]])
             + " "
@@ -55,6 +66,11 @@ class GameInteractive(Plugin):
             + "command_block "
             + str(facing)
         )
+
+    def place_command_block(
+        self, command_block_update_packet, facing=0, limit_seconds=0.5
+    ):
+        cmd = self.make_command_block_setblock(command_block_update_packet, facing)
         # 传入参数: 为 make_packet_command_block_update 方法的返回的第二个值
         self.game_ctrl.sendwocmd(
             "/tp " + " ".join([str(i) for i in command_block_update_packet["Position"]])
@@ -62,3 +78,53 @@ class GameInteractive(Plugin):
         self.game_ctrl.sendwocmd(cmd)
         time.sleep(limit_seconds)
         self.game_ctrl.sendPacket(78, command_block_update_packet)
+
+    def place_command_blocks(
+        self,
+        command_blocks: list[tuple[dict, int | None]],
+        window: int = 32,
+        timeout: float = 5,
+        tp_radius: int = 16,
+    ):
+        """
+        批量放置命令方块.
+        先放置所有命令方块外壳, 等待服务器处理完毕后再连续发送所有命令方块更新数据包,
+        每发送 window 个数据包等待一次服务器响应, 以限制在途的数据包数量.
+
+        Args:
+            command_blocks (list[tuple[dict, int | None]]): [(make_packet_command_block_update 的返回值, 朝向), ...],
+                朝向为 None 时不放置外壳, 只更新该位置已有命令方块的数据
+            window (int): 在途数据包数上限
+            timeout (float): 等待服务器响应的超时时间
+            tp_radius (int): 机器人与命令方块的距离超过此值时传送过去
+        """
+        if not command_blocks:
+            return
+        bot_pos = None
+        for packet, facing in command_blocks:
+            if facing is None:
+                continue
+            bot_pos = self._follow(packet["Position"], bot_pos, tp_radius)
+            self.governor.send(self.make_command_block_setblock(packet, facing))
+        self.wait_server(timeout)
+        bot_pos = None
+        for i, (packet, _) in enumerate(command_blocks, 1):
+            bot_pos = self._follow(packet["Position"], bot_pos, tp_radius)
+            self.governor.acquire()
+            self.game_ctrl.sendPacket(78, packet)
+            if i % window == 0:
+                self.wait_server(timeout)
+        self.wait_server(timeout)
+
+    def wait_server(self, timeout: float = 5):
+        "发送一条指令并等待其返回, 此时服务器已处理完此前发出的所有数据包"
+        try:
+            self.game_ctrl.sendcmd_with_resp("/testfor @s", timeout)
+        except TimeoutError:
+            pass
+
+    def _follow(self, pos, bot_pos, radius: int):
+        if bot_pos is None or sum(abs(a - b) for a, b in zip(pos, bot_pos)) > radius:
+            self.game_ctrl.sendwocmd("/tp " + " ".join([str(i) for i in pos]))
+            return pos
+        return bot_pos
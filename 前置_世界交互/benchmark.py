@@ -0,0 +1,77 @@
+"""
+批量放置命令方块的性能测试, 使用模拟的游戏控制器, 不需要连接服务器
+
+python -m 前置_世界交互.benchmark
+"""
+
+import time
+from . import GameInteractive
+from .rate_governor import RateGovernor
+
+
+class FakeGameControl:
+    "模拟的游戏控制器, 有返回的指令耗时 latency 秒, 其余指令和数据包只计数"
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.commands = 0
+        self.packets = 0
+        self.round_trips = 0
+
+    def sendwocmd(self, cmd: str):
+        self.commands += 1
+
+    def sendPacket(self, pkt_id: int, pkt: dict):
+        self.packets += 1
+
+    def sendcmd_with_resp(self, cmd: str, timeout: float = 30):
+        self.round_trips += 1
+        time.sleep(self.latency)
+
+
+def _make_api(game_ctrl: FakeGameControl) -> GameInteractive:
+    # 不经过插件框架创建, 跳过读取配置文件
+    api = GameInteractive.__new__(GameInteractive)
+    api.game_ctrl = game_ctrl
+    api.governor = RateGovernor(game_ctrl, 1000, auto_adjust=False)
+    return api
+
+
+def run(
+    count: int = 300,
+    batch: int = 256,
+    window: int = 32,
+    limit_seconds: float = 0.2,
+    latency: float = 0.05,
+) -> dict[str, tuple[float, int, int]]:
+    """
+    返回 {方式: (耗时 (秒), 发送的指令数, 等待返回的次数)}
+
+    batch 与 bdx导入器 的 COMMAND_BLOCK_BATCH 相同, 即每攒够这么多个命令方块批量放置一次
+    """
+    result = {}
+    gc = FakeGameControl(latency)
+    api = _make_api(gc)
+    packets = [
+        (
+            api.make_packet_command_block_update((i % 16, 64, i // 16), "say hi", 2),
+            i % 6,
+        )
+        for i in range(count)
+    ]
+    start = time.perf_counter()
+    for packet, facing in packets:
+        api.place_command_block(packet, facing, limit_seconds)
+    result["逐个放置"] = (time.perf_counter() - start, gc.commands, gc.round_trips)
+    gc = FakeGameControl(latency)
+    api = _make_api(gc)
+    start = time.perf_counter()
+    for i in range(0, count, batch):
+        api.place_command_blocks(packets[i : i + batch], window)
+    result["批量放置"] = (time.perf_counter() - start, gc.commands, gc.round_trips)
+    return result
+
+
+if __name__ == "__main__":
+    for name, (cost, commands, round_trips) in run().items():
+        print(f"{name}: {cost:.2f}秒, {commands} 条指令, 等待返回 {round_trips} 次")
@@ -0,0 +1,100 @@
+import threading
+import time
+
+
+class RateGovernor:
+    """
+    令牌桶指令限速器, 多个插件共用同一个实例时共享同一份速率
+
+    每发送一条指令消耗一个令牌, 令牌以 rate 条每秒的速度补充, 最多积攒 burst 个.
+    开启自动调节时, 有指令在发送期间会每隔 probe_interval 秒用 sendcmd_with_resp 测量一次往返延迟:
+    延迟高于 high_latency (或超时) 时速率乘以 0.7, 低于 low_latency 时速率提高 10%,
+    速率始终在 [min_rate, max_rate] 之间.
+
+    Args:
+        game_ctrl: 游戏控制器
+        rate (float): 初始速率 (条每秒), 也是自动调节的上限
+        burst (int | None): 令牌桶容量, 默认为速率的 1/10
+        auto_adjust (bool): 是否根据延迟自动调节速率
+        probe_interval (float): 测量延迟的间隔 (秒)
+        low_latency, high_latency (float): 提速 / 降速的延迟阈值 (秒)
+    """
+
+    def __init__(
+        self,
+        game_ctrl,
+        rate: float = 1000,
+        burst: int | None = None,
+        auto_adjust: bool = True,
+        probe_interval: float = 2,
+        low_latency: float = 0.15,
+        high_latency: float = 0.5,
+    ):
+        self.game_ctrl = game_ctrl
+        self.max_rate = float(rate)
+        self.min_rate = max(1.0, self.max_rate / 20)
+        self.rate = self.max_rate
+        self.burst = burst or max(1, int(rate / 10))
+        self.auto_adjust = auto_adjust
+        self.probe_interval = probe_interval
+        self.low_latency = low_latency
+        self.high_latency = high_latency
+        # 最近一次测得的往返延迟 (秒)
+        self.latency: float | None = None
+        self._tokens = float(self.burst)
+        self._last = time.perf_counter()
+        self._last_acquire = 0.0
+        self._lock = threading.Lock()
+        self._prober: threading.Thread | None = None
+
+    def acquire(self, n: int = 1):
+        "取得 n 个令牌, 令牌不足时等待"
+        with self._lock:
+            now = time.perf_counter()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._last_acquire = now
+            self._tokens -= n
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+            if self.auto_adjust and (
+                self._prober is None or not self._prober.is_alive()
+            ):
+                self._prober = threading.Thread(target=self._probe_loop, daemon=True)
+                self._prober.start()
+        if wait > 0:
+            time.sleep(wait)
+
+    def send(self, cmd: str):
+        "限速发送一条无返回的指令"
+        self.acquire()
+        self.game_ctrl.sendwocmd(cmd)
+
+    def set_rate(self, rate: float):
+        "修改速率上限, 当前速率同时重置为该值"
+        with self._lock:
+            self.max_rate = float(rate)
+            self.min_rate = max(1.0, self.max_rate / 20)
+            self.rate = self.max_rate
+
+    def _probe_loop(self):
+        # 一段时间内没有指令需要发送时退出, 下次 acquire 时重新启动
+        while time.perf_counter() - self._last_acquire < self.probe_interval * 2:
+            time.sleep(self.probe_interval)
+            self.probe()
+
+    def probe(self):
+        "测量一次往返延迟并据此调节速率"
+        start = time.perf_counter()
+        try:
+            self.game_ctrl.sendcmd_with_resp("/testfor @s", self.high_latency * 4)
+            latency = time.perf_counter() - start
+        except TimeoutError:
+            latency = float("inf")
+        with self._lock:
+            self.latency = latency
+            if latency > self.high_latency:
+                self.rate = max(self.min_rate, self.rate * 0.7)
+            elif latency < self.low_latency:
+                self.rate = min(self.max_rate, self.rate * 1.1)
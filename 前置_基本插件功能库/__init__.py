@@ -1,21 +1,17 @@
 import json
-import time
-from tooldelta import Plugin, plugins, Frame
-
-
-def find_key_from_value(dic, val):
-    # A bad method!
-    for k, v in dic.items():
-        if v == val:
-            return k
-
+from tooldelta import Plugin, plugins, Frame, Config
+from .scoreboard_cache import ScoreboardCache, parse_score_list
+from .position_service import PositionService
+from .player_index import PlayerIndex
+from .msg_waiter import MessageWaiters, PlayerLeft
+from .block_query import BlockQuery, parse_block_name
 
 plugins.checkSystemVersion((0, 7, 5))
 
 
 @plugins.add_plugin_as_api("基本插件功能库")
 class BasicFunctionLib(Plugin):
-    version = (0, 0, 10)
+    version = (0, 0, 15)
     name = "基本插件功能库"
     author = "SuperScript"
     description = "提供额外的方法用于获取游戏数据"
@@ -23,57 +19,77 @@ class BasicFunctionLib(Plugin):
     def __init__(self, frame: Frame):
         self.frame = frame
         self.game_ctrl = frame.get_game_control()
-        self.waitmsg_req = []
-        self.waitmsg_result = {}
+        self.msg_waiters = MessageWaiters()
+        CFG = {
+            "计分板缓存有效期(秒)": 1.0,
+            "坐标缓存有效期(秒)": 0.1,
+            "方块查询并发数": 16,
+            "方块缓存有效期(秒)": 5.0,
+        }
+        cfg, _ = Config.getPluginConfigAndVersion(
+            self.name, Config.auto_to_std(CFG), CFG, self.version
+        )
+        self.scoreboard = ScoreboardCache(self.game_ctrl, cfg["计分板缓存有效期(秒)"])
+        self.positions = PositionService(self.game_ctrl, cfg["坐标缓存有效期(秒)"])
+        self.players = PlayerIndex(self.game_ctrl)
+        self.blocks = BlockQuery(
+            self.game_ctrl, cfg["方块查询并发数"], cfg["方块缓存有效期(秒)"]
+        )
+        for method in ("sendcmd", "sendwscmd", "sendwocmd", "sendcmd_with_resp"):
+            self._watch_cmds(method)
+
+    def _watch_cmds(self, method: str):
+        # 本端插件修改分数或方块时使对应的缓存失效
+        send = getattr(self.game_ctrl, method)
+        # 插件重载时替换上一个实例的包装, 而不是在其外再包一层
+        send = getattr(send, "_basic_lib_original", send)
+
+        def _send(cmd: str, *args, **kwargs):
+            self.scoreboard.observe_command(cmd)
+            self.blocks.observe_command(cmd)
+            return send(cmd, *args, **kwargs)
+
+        _send._basic_lib_original = send  # type: ignore
+        setattr(self.game_ctrl, method, _send)
 
     def on_player_message(self, player: str, msg: str):
-        if player in self.waitmsg_req:
-            self.waitmsg_result[player] = msg
-            self.waitmsg_req.remove(player)
+        self.msg_waiters.deliver(player, msg)
+
+    def on_player_join(self, player: str):
+        self.players.add(player)
 
     def on_player_leave(self, player: str):
-        if player in self.waitmsg_req:
-            self.waitmsg_result[player] = EXC_PLAYER_LEAVE
-            self.waitmsg_req.remove(player)
+        self.players.remove(player)
+        self.msg_waiters.leave(player)
 
     # -------------- API ---------------
     def getScore(self, scoreboardNameToGet: str, targetNameToGet: str) -> int | list:
-        "获取玩家计分板分数 (计分板名, 玩家/计分板项名) 获取失败引发异常"
+        """
+        获取玩家计分板分数 (计分板名, 玩家/计分板项名) 获取失败引发异常
+        单个目标的分数读取自计分板缓存, 最多比实际分数滞后 "计分板缓存有效期" 秒
+        """
+        if not (targetNameToGet == "*" or targetNameToGet.startswith("@")):
+            # 单个目标的分数从计分板快照中读取
+            if scoreboardNameToGet == "*":
+                return self.scoreboard.get_all(targetNameToGet)
+            return self.scoreboard.get(scoreboardNameToGet, targetNameToGet)
         resultList = self.game_ctrl.sendwscmd(
             f"/scoreboard players list {targetNameToGet}", True
         ).OutputMessages  # type: ignore
-        result = {}
-        result2 = {}
-        for i in resultList:
-            Message = i.Message
-            if Message == r"commands.scoreboard.players.list.player.empty":
-                continue
-            if Message == r"§a%commands.scoreboard.players.list.player.count":
-                targetName = i.Parameters[1][1:]
-            elif Message == "commands.scoreboard.players.list.player.entry":
-                if targetName == "commands.scoreboard.players.offlinePlayerName":
-                    continue
-                scoreboardName = i.Parameters[2]
-                targetScore = int(i.Parameters[0])
-                if targetName not in result:
-                    result[targetName] = {}
-                result[targetName][scoreboardName] = targetScore
-                if scoreboardName not in result2:
-                    result2[scoreboardName] = {}
-                result2[scoreboardName][targetName] = targetScore
+        result, result2 = parse_score_list(resultList)
         if not (result or result2):
             raise Exception("Failed to get the score.")
+        if scoreboardNameToGet == "*":
+            raise ValueError("暂时无法获取 *ALL 计分板")
         try:
-            if targetNameToGet == "*" or targetNameToGet.startswith("@"):
-                if scoreboardNameToGet == "*":
-                    raise ValueError("暂时无法获取 *ALL 计分板")
-                return result2[scoreboardNameToGet]
-            if scoreboardNameToGet == "*":
-                return result[targetNameToGet]
-            return result[targetNameToGet][scoreboardNameToGet]
+            return result2[scoreboardNameToGet]
         except KeyError as err:
             raise Exception(f"Failed to get score: {err}")
 
+    def getScoreCacheStats(self) -> dict[str, int]:
+        "计分板缓存的命中与未命中 (需要重新获取快照) 次数"
+        return {"hits": self.scoreboard.hits, "misses": self.scoreboard.misses}
+
     def getPos(self, targetNameToGet: str, timeout: float = 1) -> dict:
         """
         获取租赁服内玩家坐标的函数
@@ -81,6 +97,7 @@ class BasicFunctionLib(Plugin):
             targetNameToGet: str -> 玩家名称
         返回: dict -> 获取结果
         包含了["x"], ["y"], ["z"]: float, ["dimension"](维度): int 和["yRot"]: float
+        同时获取多个玩家或 @a 的坐标时会合并为一条 querytarget @a
         """
         if (
             (targetNameToGet not in self.game_ctrl.allplayers)
@@ -88,6 +105,20 @@ class BasicFunctionLib(Plugin):
             and (not targetNameToGet.startswith("@a"))
         ):
             raise Exception("Player not found.")
+        if targetNameToGet == "@a" or not targetNameToGet.startswith("@a"):
+            # 所有玩家与单个玩家的坐标共用合并后的 querytarget @a
+            result = self._parse_positions(self.positions.query(timeout))
+            if targetNameToGet == "@a":
+                return result
+            res = result.get(targetNameToGet)
+            if res:
+                return res
+            raise ValueError(
+                "error(debug): 找不到坐标-玩家, 结果表是",
+                result,
+                "目标选择器是",
+                targetNameToGet,
+            )
         result = self.game_ctrl.sendcmd_with_resp(
             "/querytarget " + targetNameToGet, timeout
         )
@@ -100,9 +131,35 @@ class BasicFunctionLib(Plugin):
             resultList = json.loads(parameter)
         else:
             resultList = parameter
+        result = self._parse_positions(resultList)
+        if len(result) != 1:
+            raise Exception("Failed to get the position.")
+        return next(iter(result.values()))
+
+    def queryTargetAll(
+        self, timeout: float = 1, max_age: float | None = None
+    ) -> list[dict]:
+        """
+        获取 /querytarget @a 的原始结果, 同时发起的请求会合并为一条指令
+        参数:
+            timeout: float -> 指令超时时间
+            max_age: float | None -> 可接受的结果最长时间, 默认为 "坐标缓存有效期"
+        返回: list[dict] -> querytarget 返回的实体列表, 请勿修改
+        """
+        return self.positions.query(timeout, max_age)
+
+    def getPlayerByUUID(self, uuid: str) -> str | None:
+        "根据玩家 UUID 获取玩家名, 找不到返回 None"
+        return self.players.by_uuid(uuid)
+
+    def getPlayerByRuntimeID(self, runtimeid: int) -> str | None:
+        "根据实体 RuntimeID 获取玩家名, 不是玩家或找不到返回 None"
+        return self.players.by_runtime_id(runtimeid)
+
+    def _parse_positions(self, resultList: list[dict]) -> dict:
         result = {}
         for i in resultList:
-            targetName = find_key_from_value(self.game_ctrl.players_uuid, i["uniqueId"])
+            targetName = self.players.by_uuid(i["uniqueId"])
             x = (
                 i["position"]["x"]
                 if i["position"]["x"] >= 0
@@ -126,22 +183,7 @@ class BasicFunctionLib(Plugin):
                 "position": position,
                 "yRot": yRot,
             }
-        if targetNameToGet == "@a":
-            return result
-        if len(result) != 1:
-            raise Exception("Failed to get the position.")
-        if targetNameToGet.startswith("@a"):
-            return next(iter(result.values()))
-        res = result.get(targetNameToGet)
-        if res:
-            return res
-        else:
-            raise ValueError(
-                "error(debug): 找不到坐标-玩家, 结果表是",
-                res,
-                "目标选择器是",
-                targetNameToGet,
-            )
+        return result
 
     def getItem(self, targetName: str, itemName: str, itemSpecialID: int = -1) -> int:
         "获取玩家背包内物品数量: 目标选择器, 物品ID, 特殊值 = 所有"
@@ -178,35 +220,71 @@ class BasicFunctionLib(Plugin):
     def getBlockTile(self, x: int, y: int, z: int):
         "获取指定坐标的方块的ID"
         res = self.game_ctrl.sendcmd_with_resp(f"/testforblock {x} {y} {z} air")
-        if res.SuccessCount:
-            return "air"
-        return res.OutputMessages[0].Parameters[4].strip("%tile.").strip(".name")
+        name = parse_block_name(res)
+        if name is None:
+            raise ValueError(f"Failed to get the block at {x} {y} {z}")
+        return name
+
+    def getBlockTiles(
+        self,
+        coords: list[tuple[int, int, int]] | None = None,
+        *,
+        region: tuple[tuple[int, int, int], tuple[int, int, int]] | None = None,
+        max_age: float | None = None,
+    ):
+        """
+        批量获取方块ID, 多条 testforblock 同时进行, 结果会被缓存
+
+        Args:
+            coords: 坐标列表, 返回与其一一对应的方块ID列表, 查询失败的为 None
+            region: 区域的两个角坐标, 返回 (方块ID表, numpy 下标数组),
+                grid[x - x0, y - y0, z - z0] 为该坐标的方块ID在表中的下标
+            max_age: 可接受的缓存最长时间 (秒), 为 0 时不使用缓存
+
+        Returns:
+            list[str | None] | tuple[list[str | None], numpy.ndarray]
+        """
+        if region is not None:
+            return self.blocks.get_grid(region[0], region[1], max_age)
+        if coords is None:
+            raise ValueError("需要提供 coords 或 region")
+        return self.blocks.get(coords, max_age)
 
     def waitMsg(self, who: str, timeout: int = 30, exc=None):
         """
         使用其来等待一个玩家的聊天栏回复, 超时则引发exc给定的异常, 没有给定时超时返回None
         当过程中玩家退出了游戏, 则引发异常(为IOError)
         """
-        time.sleep(0.5)
-        if who not in self.waitmsg_req:
-            self.waitmsg_req.append(who)
-        timer = time.time()
-        while 1:
-            time.sleep(0.2)
-            if who in self.waitmsg_result.keys():
-                r = self.waitmsg_result[who]
-                del self.waitmsg_result[who]
-                if r == EXC_PLAYER_LEAVE:
-                    raise EXC_PLAYER_LEAVE
-                return r
-            if time.time() - timer >= timeout:
-                try:
-                    self.waitmsg_req.remove(who)
-                except Exception:
-                    pass
-                if exc is not None:
-                    raise exc
-                return None
+        res = self.waitMsgAny([who], timeout, exc)
+        return None if res is None else res[1]
+
+    def waitMsgAny(
+        self, players: list[str], timeout: int = 30, exc=None
+    ) -> tuple[str, str] | None:
+        """
+        等待其中任意一名玩家的聊天栏回复, 返回 (玩家名, 消息)
+        超时则引发exc给定的异常, 没有给定时超时返回None
+        当过程中玩家全部退出了游戏, 则引发异常(为IOError)
+        """
+        try:
+            res = self.msg_waiters.wait(players, timeout)
+        except PlayerLeft:
+            raise EXC_PLAYER_LEAVE
+        if res is None and exc is not None:
+            raise exc
+        return res
+
+    async def waitMsgAsync(self, who: str, timeout: int = 30, exc=None):
+        "waitMsg 的协程版本, 用于注入式插件的协程中"
+        try:
+            res = await self.msg_waiters.wait_async([who], timeout)
+        except PlayerLeft:
+            raise EXC_PLAYER_LEAVE
+        if res is None:
+            if exc is not None:
+                raise exc
+            return None
+        return res[1]
 
     def getPosXYZ(self, player, timeout=30) -> tuple[float, float, float]:
         "获取玩家坐标的X, Y, Z值"
@@ -0,0 +1,82 @@
+"""
+合并坐标请求的性能测试, 使用模拟的游戏控制器, 不需要连接服务器
+
+python -m 前置_基本插件功能库.benchmark
+"""
+
+import json
+import threading
+import time
+from .position_service import PositionService
+
+
+class _Output:
+    def __init__(self, parameters):
+        self.Success = True
+        self.Parameters = parameters
+
+
+class _Result:
+    def __init__(self, parameters):
+        self.SuccessCount = 1
+        self.OutputMessages = [_Output(parameters)]
+
+
+class FakeGameControl:
+    "模拟 querytarget 的游戏控制器, 每条指令耗时 latency 秒, 同一时间只处理一条"
+
+    def __init__(self, players: int = 20, latency: float = 0.05):
+        self.latency = latency
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._content = json.dumps(
+            [
+                {
+                    "uniqueId": f"uuid-{i}",
+                    "position": {"x": i, "y": 64, "z": i},
+                    "dimension": 0,
+                    "yRot": 0,
+                }
+                for i in range(players)
+            ]
+        )
+
+    def sendcmd_with_resp(self, cmd: str, timeout: float = 30):
+        with self._lock:
+            self.commands += 1
+            time.sleep(self.latency)
+        return _Result([self._content])
+
+
+def _run_callers(callers: int, func) -> float:
+    barrier = threading.Barrier(callers)
+
+    def caller():
+        barrier.wait()
+        func()
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def run(callers: int = 50, latency: float = 0.05) -> dict[str, tuple[float, int]]:
+    "返回 {方式: (所有调用者完成的耗时 (秒), 发送的指令数)}"
+    result = {}
+    gc = FakeGameControl(latency=latency)
+    cost = _run_callers(callers, lambda: gc.sendcmd_with_resp("/querytarget @a"))
+    result["各自发送"] = (cost, gc.commands)
+    gc = FakeGameControl(latency=latency)
+    service = PositionService(gc)
+    cost = _run_callers(callers, service.query)
+    result["合并请求"] = (cost, gc.commands)
+    return result
+
+
+if __name__ == "__main__":
+    for name, (cost, commands) in run().items():
+        print(f"{name}: {cost:.2f}秒, {commands} 条指令")
@@ -0,0 +1,184 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+Vec = tuple[int, int, int]
+
+# 会修改方块的指令: (指令名, 坐标参数)
+BLOCK_CHANGE_RULE = re.compile(
+    r"(?:^/?|\brun\s+/?)(setblock|fill|clone)\s+((?:\S+\s+){2,8}\S+)"
+)
+_COORD = re.compile(r"^-?\d+$")
+
+
+def parse_block_name(res) -> str | None:
+    "解析 /testforblock <坐标> air 的返回, 无法解析时返回 None"
+    if res.SuccessCount:
+        return "air"
+    try:
+        name = res.OutputMessages[0].Parameters[4]
+    except (IndexError, TypeError):
+        return None
+    return name.removeprefix("%").removeprefix("tile.").removesuffix(".name")
+
+
+def _changed_box(cmd: str) -> tuple[Vec, Vec] | bool | None:
+    """
+    获取指令会修改的区域
+
+    Returns:
+        (最小坐标, 最大坐标); 不修改方块时返回 None; 无法确定区域时返回 True
+    """
+    match = BLOCK_CHANGE_RULE.search(cmd)
+    if match is None:
+        return None
+    name, args = match.groups()
+    args = args.split()
+    # clone 修改的是第三组坐标 (目标位置) 开始的区域, 大小与源区域相同
+    need = {"setblock": 3, "fill": 6, "clone": 9}[name]
+    if len(args) < need or not all(_COORD.match(i) for i in args[:need]):
+        return True
+    n = [int(i) for i in args[:need]]
+    if name == "setblock":
+        return (n[0], n[1], n[2]), (n[0], n[1], n[2])
+    lo = tuple(min(n[i], n[i + 3]) for i in range(3))
+    hi = tuple(max(n[i], n[i + 3]) for i in range(3))
+    if name == "fill":
+        return lo, hi  # type: ignore
+    return (
+        (n[6], n[7], n[8]),
+        tuple(n[6 + i] + hi[i] - lo[i] for i in range(3)),
+    )  # type: ignore
+
+
+class BlockQuery:
+    """
+    批量方块查询
+
+    同时保持至多 in_flight 条 /testforblock 在等待返回, 每条的返回对应回其坐标.
+    查询结果缓存 max_age 秒, 本端发出的 setblock/fill/clone 指令会使涉及区域的缓存失效.
+
+    Attributes:
+        hits (int): 从缓存中读取的方块数
+        queries (int): 实际发送 testforblock 的次数
+    """
+
+    def __init__(self, game_ctrl, in_flight: int = 16, max_age: float = 5):
+        self.game_ctrl = game_ctrl
+        self.max_age = max_age
+        self.hits = 0
+        self.queries = 0
+        self._pool = ThreadPoolExecutor(in_flight, "block_query")
+        self._cache: dict[Vec, tuple[str, float]] = {}
+        # 每次失效都会增加; 查询期间发生过失效则不缓存该次结果
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, coords: list[Vec], max_age: float | None = None) -> list[str | None]:
+        """
+        获取多个坐标的方块ID
+
+        Args:
+            coords: 坐标列表
+            max_age: 可接受的缓存最长时间, 默认为 self.max_age, 为 0 时不使用缓存
+
+        Returns:
+            list[str | None]: 与 coords 一一对应的方块ID, 查询失败的为 None
+        """
+        if max_age is None:
+            max_age = self.max_age
+        now = time.time()
+        result: list[str | None] = [None] * len(coords)
+        # 坐标 -> 在 coords 中的所有位置, 重复的坐标只查询一次
+        missing: dict[Vec, list[int]] = {}
+        with self._lock:
+            for i, pos in enumerate(coords):
+                pos = tuple(pos)  # type: ignore
+                cached = self._cache.get(pos)
+                if cached is not None and now - cached[1] <= max_age:
+                    result[i] = cached[0]
+                    self.hits += 1
+                else:
+                    missing.setdefault(pos, []).append(i)
+            generation = self._generation
+            self.queries += len(missing)
+        for pos, name in zip(missing, self._pool.map(self._query, missing)):
+            for i in missing[pos]:
+                result[i] = name
+        with self._lock:
+            if generation == self._generation:
+                now = time.time()
+                for pos, indexes in missing.items():
+                    if result[indexes[0]] is not None:
+                        self._cache[pos] = (result[indexes[0]], now)  # type: ignore
+        return result
+
+    def get_grid(self, lo: Vec, hi: Vec, max_age: float | None = None):
+        """
+        获取区域内所有方块
+
+        Returns:
+            tuple[list[str | None], numpy.ndarray]: (方块ID表, 方块ID在表中的下标),
+                下标数组形状为 (dx, dy, dz), grid[x - x0, y - y0, z - z0]
+        """
+        import numpy as np
+
+        lo, hi = (
+            tuple(min(lo[i], hi[i]) for i in range(3)),
+            tuple(max(lo[i], hi[i]) for i in range(3)),
+        )  # type: ignore
+        shape = tuple(hi[i] - lo[i] + 1 for i in range(3))
+        coords = [
+            (lo[0] + x, lo[1] + y, lo[2] + z)
+            for x in range(shape[0])
+            for y in range(shape[1])
+            for z in range(shape[2])
+        ]
+        names = self.get(coords, max_age)
+        palette = list(dict.fromkeys(names))
+        index = {name: i for i, name in enumerate(palette)}
+        grid = np.fromiter(
+            (index[name] for name in names), dtype=np.uint16, count=len(names)
+        ).reshape(shape)
+        return palette, grid
+
+    def invalidate(self, lo: Vec | None = None, hi: Vec | None = None):
+        "使区域内的缓存失效; 不传参数则清空缓存"
+        with self._lock:
+            self._generation += 1
+            if lo is None or hi is None:
+                self._cache.clear()
+                return
+            volume = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+            if volume <= len(self._cache):
+                for x in range(lo[0], hi[0] + 1):
+                    for y in range(lo[1], hi[1] + 1):
+                        for z in range(lo[2], hi[2] + 1):
+                            self._cache.pop((x, y, z), None)
+            else:
+                for pos in [
+                    p
+                    for p in self._cache
+                    if all(lo[i] <= p[i] <= hi[i] for i in range(3))
+                ]:
+                    del self._cache[pos]
+
+    def observe_command(self, cmd: str):
+        "检查一条即将发送的指令, 若会修改方块则使对应的缓存失效"
+        box = _changed_box(cmd.strip())
+        if box is None:
+            return
+        if box is True:
+            # 相对坐标等无法确定区域的情况
+            self.invalidate()
+        else:
+            self.invalidate(*box)
+
+    def _query(self, pos: Vec) -> str | None:
+        x, y, z = pos
+        try:
+            res = self.game_ctrl.sendcmd_with_resp(f"/testforblock {x} {y} {z} air")
+        except Exception:
+            return None
+        return parse_block_name(res)
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+# 等待开始后这段时间内收到的消息不作为回复:
+# 触发等待的那条聊天消息可能晚于等待开始才分发到本插件
+MIN_REPLY_DELAY = 0.3
+
+
+class PlayerLeft(Exception):
+    "等待的玩家全部退出了游戏"
+
+
+class _Waiter:
+    def __init__(self, players: set[str], callback=None):
+        self.players = players
+        self.since = time.time()
+        self.done = threading.Event()
+        self.result: tuple[str, str] | None = None
+        self.left = False
+        self.callback = callback
+
+
+class MessageWaiters:
+    """
+    按玩家名索引的聊天消息等待者
+
+    玩家发送消息时立即唤醒等待该玩家的所有等待者, 不轮询.
+    一个等待者可以同时等待多名玩家, 由其中第一个回复的玩家唤醒.
+    """
+
+    def __init__(self):
+        self._waiters: dict[str, list[_Waiter]] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, players: list[str], timeout: float) -> tuple[str, str] | None:
+        """
+        等待其中任意一名玩家的消息
+
+        Returns:
+            tuple[str, str] | None: (玩家名, 消息), 超时返回 None
+
+        Raises:
+            PlayerLeft: 等待期间玩家全部退出了游戏
+        """
+        waiter = self._register(players)
+        if not waiter.done.wait(timeout):
+            self._unregister(waiter)
+        return self._result(waiter)
+
+    async def wait_async(
+        self, players: list[str], timeout: float
+    ) -> tuple[str, str] | None:
+        "wait 的协程版本, 等待期间不占用线程"
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake(_):
+            if not future.done():
+                future.set_result(None)
+
+        waiter = self._register(
+            players, lambda w: loop.call_soon_threadsafe(wake, w)
+        )
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._unregister(waiter)
+        return self._result(waiter)
+
+    def deliver(self, player: str, msg: str):
+        "玩家发送了消息"
+        now = time.time()
+        with self._lock:
+            waiters = [
+                w
+                for w in self._waiters.get(player, ())
+                if now - w.since >= MIN_REPLY_DELAY
+            ]
+            for waiter in waiters:
+                waiter.result = (player, msg)
+                self._resolve(waiter)
+
+    def leave(self, player: str):
+        "玩家退出了游戏"
+        with self._lock:
+            for waiter in self._waiters.pop(player, ()):
+                waiter.players.discard(player)
+                if not waiter.players:
+                    waiter.left = True
+                    self._resolve(waiter)
+
+    def _register(self, players: list[str], callback=None) -> _Waiter:
+        waiter = _Waiter(set(players), callback)
+        with self._lock:
+            for player in waiter.players:
+                self._waiters.setdefault(player, []).append(waiter)
+        return waiter
+
+    def _unregister(self, waiter: _Waiter):
+        with self._lock:
+            self._detach(waiter)
+
+    def _resolve(self, waiter: _Waiter):
+        self._detach(waiter)
+        waiter.done.set()
+        if waiter.callback is not None:
+            waiter.callback(waiter)
+
+    def _detach(self, waiter: _Waiter):
+        for player in waiter.players:
+            waiters = self._waiters.get(player)
+            if waiters is None:
+                continue
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                del self._waiters[player]
+
+    @staticmethod
+    def _result(waiter: _Waiter) -> tuple[str, str] | None:
+        if waiter.result is not None:
+            return waiter.result
+        if waiter.left:
+            raise PlayerLeft
+        return None
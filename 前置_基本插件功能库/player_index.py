@@ -0,0 +1,85 @@
+import threading
+import time
+
+
+class PlayerIndex:
+    """
+    玩家 UUID / 实体 RuntimeID -> 玩家名 的反向索引
+
+    在玩家进出服时增量更新; 查找不到时从游戏控制器重新建立索引,
+    为避免非玩家实体反复触发, 两次重建至少间隔 REBUILD_INTERVAL 秒.
+    """
+
+    REBUILD_INTERVAL = 1.0
+
+    def __init__(self, game_ctrl):
+        self.game_ctrl = game_ctrl
+        self._by_uuid: dict[str, str] = {}
+        self._by_runtime_id: dict[int, str] = {}
+        # 玩家名 -> (UUID, RuntimeID), 用于玩家退出时删除
+        self._keys: dict[str, tuple[str | None, int | None]] = {}
+        self._rebuilt = 0.0
+        self._lock = threading.Lock()
+
+    def by_uuid(self, uuid: str) -> str | None:
+        name = self._by_uuid.get(uuid)
+        if name is None and self._try_rebuild():
+            name = self._by_uuid.get(uuid)
+        return name
+
+    def by_runtime_id(self, runtimeid: int) -> str | None:
+        name = self._by_runtime_id.get(runtimeid)
+        if name is None and self._try_rebuild():
+            name = self._by_runtime_id.get(runtimeid)
+        return name
+
+    def add(self, player: str):
+        "玩家进入游戏"
+        uuid = self.game_ctrl.players_uuid.get(player)
+        runtimeid = None
+        for data in self.game_ctrl.all_players_data or ():
+            if data.name == player:
+                runtimeid = data.entity_runtime_id
+                break
+        with self._lock:
+            self._remove(player)
+            self._keys[player] = (uuid, runtimeid)
+            if uuid is not None:
+                self._by_uuid[uuid] = player
+            if runtimeid is not None:
+                self._by_runtime_id[runtimeid] = player
+
+    def remove(self, player: str):
+        "玩家退出游戏"
+        with self._lock:
+            self._remove(player)
+
+    def rebuild(self):
+        "从游戏控制器的玩家数据重新建立索引"
+        keys: dict[str, list] = {
+            name: [uuid, None] for name, uuid in self.game_ctrl.players_uuid.items()
+        }
+        for data in self.game_ctrl.all_players_data or ():
+            keys.setdefault(data.name, [None, None])[1] = data.entity_runtime_id
+        with self._lock:
+            self._keys = {name: (uuid, rid) for name, (uuid, rid) in keys.items()}
+            self._by_uuid = {
+                uuid: name for name, (uuid, _) in self._keys.items() if uuid is not None
+            }
+            self._by_runtime_id = {
+                rid: name for name, (_, rid) in self._keys.items() if rid is not None
+            }
+            self._rebuilt = time.time()
+
+    def _try_rebuild(self) -> bool:
+        if time.time() - self._rebuilt < self.REBUILD_INTERVAL:
+            return False
+        self.rebuild()
+        return True
+
+    def _remove(self, player: str):
+        uuid, runtimeid = self._keys.pop(player, (None, None))
+        if uuid is not None and self._by_uuid.get(uuid) == player:
+            del self._by_uuid[uuid]
+        if runtimeid is not None and self._by_runtime_id.get(runtimeid) == player:
+            del self._by_runtime_id[runtimeid]
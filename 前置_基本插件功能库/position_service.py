@@ -0,0 +1,93 @@
+import json
+import threading
+import time
+
+
+class _Flight:
+    "一次正在进行的 querytarget @a"
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: list[dict] | None = None
+        self.error: BaseException | None = None
+
+
+class PositionService:
+    """
+    合并 /querytarget @a 请求
+
+    快照未超过 max_age 秒时直接返回快照;
+    否则第一个请求者等待 window 秒收集同时到达的请求后发送一条 querytarget @a,
+    期间到达的请求都等待这一条指令的结果, 不再各自发送.
+
+    Attributes:
+        hits (int): 直接返回快照的次数
+        shared (int): 等待其他请求者结果的次数
+        queries (int): 实际发送 querytarget 的次数
+    """
+
+    def __init__(self, game_ctrl, max_age: float = 0.1, window: float = 0.01):
+        self.game_ctrl = game_ctrl
+        self.max_age = max_age
+        self.window = window
+        self.hits = 0
+        self.shared = 0
+        self.queries = 0
+        self._snapshot: list[dict] | None = None
+        self._time = 0.0
+        self._flight: _Flight | None = None
+        self._lock = threading.Lock()
+
+    def query(self, timeout: float = 1, max_age: float | None = None) -> list[dict]:
+        """
+        获取所有玩家的 querytarget 结果
+
+        Args:
+            timeout: 指令超时时间
+            max_age: 可接受的快照最长时间, 默认为 self.max_age
+
+        Returns:
+            list[dict]: querytarget 返回的原始实体列表, 调用者不应修改
+        """
+        if max_age is None:
+            max_age = self.max_age
+        with self._lock:
+            if self._snapshot is not None and time.time() - self._time <= max_age:
+                self.hits += 1
+                return self._snapshot
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+            else:
+                self.shared += 1
+        if leader:
+            self._fly(flight, timeout)
+        elif not flight.done.wait(timeout + self.window):
+            raise TimeoutError("querytarget @a 超时")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result  # type: ignore
+
+    def _fly(self, flight: _Flight, timeout: float):
+        try:
+            time.sleep(self.window)
+            self.queries += 1
+            result = self.game_ctrl.sendcmd_with_resp("/querytarget @a", timeout)
+            if result.OutputMessages[0].Success is False:
+                raise Exception(
+                    f"Failed to get the position: {result.OutputMessages[0].Parameters[0]}"
+                )
+            parameter = result.OutputMessages[0].Parameters[0]
+            if isinstance(parameter, str):
+                parameter = json.loads(parameter)
+            flight.result = parameter
+            with self._lock:
+                self._snapshot = parameter
+                self._time = time.time()
+        except BaseException as err:
+            flight.error = err
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
@@ -0,0 +1,124 @@
+import re
+import threading
+import time
+
+# 会修改分数的计分板指令: (子命令, 目标, 计分板名)
+SCORE_CHANGE_RULE = re.compile(
+    r'^/?scoreboard\s+players\s+(set|add|remove|reset|random|operation)\s+'
+    r'("[^"]*"|\S+)(?:\s+(\S+))?'
+)
+
+
+def parse_score_list(outputs) -> tuple[dict, dict]:
+    """
+    解析 /scoreboard players list 的返回
+
+    Returns:
+        ({目标: {计分板: 分数}}, {计分板: {目标: 分数}})
+    """
+    result = {}
+    result2 = {}
+    targetName = None
+    for i in outputs:
+        Message = i.Message
+        if Message == r"commands.scoreboard.players.list.player.empty":
+            continue
+        if Message == r"§a%commands.scoreboard.players.list.player.count":
+            targetName = i.Parameters[1][1:]
+        elif Message == "commands.scoreboard.players.list.player.entry":
+            if targetName == "commands.scoreboard.players.offlinePlayerName":
+                continue
+            scoreboardName = i.Parameters[2]
+            targetScore = int(i.Parameters[0])
+            if targetName not in result:
+                result[targetName] = {}
+            result[targetName][scoreboardName] = targetScore
+            if scoreboardName not in result2:
+                result2[scoreboardName] = {}
+            result2[scoreboardName][targetName] = targetScore
+    return result, result2
+
+
+class ScoreboardCache:
+    """
+    计分板分数快照缓存
+
+    读取时若快照已超过 max_age 秒, 或要读取的分数已被本端的指令修改过,
+    则用一条 /scoreboard players list * 重新获取所有计分板的快照, 否则直接从内存读取.
+    多个线程同时需要刷新时只会发送一次指令.
+
+    Attributes:
+        hits (int): 从快照中读取的次数
+        misses (int): 需要刷新快照的次数
+    """
+
+    def __init__(self, game_ctrl, max_age: float = 1):
+        self.game_ctrl = game_ctrl
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._scores: dict[str, dict[str, int]] = {}
+        self._time = 0.0
+        # 被修改过的 (目标, 计分板); 目标为 None 表示整个计分板, 计分板为 None 表示该目标的所有分数
+        self._dirty: set[tuple[str | None, str | None]] = set()
+        self._lock = threading.Lock()
+
+    def get(self, scoreboard: str, target: str) -> int:
+        "获取目标在计分板上的分数, 获取失败引发 ValueError"
+        self._ensure_fresh(scoreboard, target)
+        try:
+            return self._scores[target][scoreboard]
+        except KeyError as err:
+            raise ValueError(f"Failed to get score: {err}")
+
+    def get_all(self, target: str) -> dict[str, int]:
+        "获取目标在所有计分板上的分数, 获取失败引发 ValueError"
+        self._ensure_fresh(None, target)
+        try:
+            return dict(self._scores[target])
+        except KeyError as err:
+            raise ValueError(f"Failed to get score: {err}")
+
+    def refresh(self):
+        "立即重新获取快照"
+        # 获取期间新发出的修改指令不一定反映在快照中, 只清除获取前的修改标记
+        pending = set(self._dirty)
+        outputs = self.game_ctrl.sendwscmd(
+            "/scoreboard players list *", True
+        ).OutputMessages  # type: ignore
+        self._scores, _ = parse_score_list(outputs)
+        self._time = time.time()
+        self._dirty -= pending
+
+    def invalidate(self, scoreboard: str | None = None, target: str | None = None):
+        "标记分数已被修改, 下次读取时重新获取; 不传参数则使整个快照失效"
+        self._dirty.add((target, scoreboard))
+
+    def observe_command(self, cmd: str):
+        "检查一条即将发送的指令, 若会修改分数则使对应的缓存失效"
+        match = SCORE_CHANGE_RULE.match(cmd.strip())
+        if match is None:
+            return
+        _, target, scoreboard = match.groups()
+        target = target.strip('"')
+        if target == "*" or target.startswith("@"):
+            target = None
+        self.invalidate(scoreboard, target)
+
+    def _ensure_fresh(self, scoreboard: str | None, target: str):
+        if self._stale(scoreboard, target):
+            with self._lock:
+                # 等待锁期间其他线程可能已经刷新过
+                if self._stale(scoreboard, target):
+                    self.misses += 1
+                    self.refresh()
+                    return
+        self.hits += 1
+
+    def _stale(self, scoreboard: str | None, target: str) -> bool:
+        if time.time() - self._time > self.max_age:
+            return True
+        return any(
+            (t is None or t == target) and (s is None or scoreboard in (None, s))
+            for t, s in tuple(self._dirty)
+        )
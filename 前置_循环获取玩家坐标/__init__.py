@@ -1,13 +1,12 @@
 import time
-import ujson
 import dataclasses
-from tooldelta import plugins, Plugin, Print, Utils
+from tooldelta import plugins, Plugin, Print, Utils, TYPE_CHECKING
 
 @plugins.add_plugin_as_api("循环获取玩家坐标")
 class RepeatGetPlayerPos(Plugin):
     name = "前置-循环获取玩家坐标"
     author = "ToolDelta"
-    version = (0, 0, 1)
+    version = (0, 0, 3)
 
     CYCLE = 1
 
@@ -19,6 +18,14 @@ class RepeatGetPlayerPos(Plugin):
         yRot: float
         dimension: int
 
+    def on_def(self):
+        # 与其他插件的坐标请求共用 querytarget @a
+        self.funclib = plugins.get_plugin_api("基本插件功能库", (0, 0, 13))
+        if TYPE_CHECKING:
+            from 前置_基本插件功能库 import BasicFunctionLib
+
+            self.funclib = plugins.instant_plugin_api(BasicFunctionLib)
+
     def on_inject(self):
         self.player_posdata: dict[str, "RepeatGetPlayerPos.PlayerPosData"] = {}
         self._main_thread()
@@ -51,18 +58,21 @@ class RepeatGetPlayerPos(Plugin):
     @Utils.thread_func("循环获取玩家坐标")
     def _main_thread(self):
         while 1:
-            uuid2player = {v: k for k, v in self.game_ctrl.players_uuid.items()}
             try:
-                result = self.game_ctrl.sendcmd_with_resp("/querytarget @a")
-                if result.SuccessCount == 0:
-                    Print.print_err(f"获取玩家坐标: 无法获取坐标: {result.OutputMessages[0].Message}")
+                content = self.funclib.queryTargetAll(30)
             except TimeoutError:
                 Print.print_war("获取玩家坐标: 获取指令返回超时")
                 continue
-            content = ujson.loads(result.OutputMessages[0].Parameters[0])
+            except Exception as err:
+                Print.print_err(f"获取玩家坐标: 无法获取坐标: {err}")
+                time.sleep(self.CYCLE)
+                continue
             for i in content:
                 content_pos = i["position"]
-                self.player_posdata[uuid2player[i["uniqueId"]]] = self.PlayerPosData(
+                player = self.funclib.getPlayerByUUID(i["uniqueId"])
+                if player is None:
+                    continue
+                self.player_posdata[player] = self.PlayerPosData(
                     content_pos["x"],
                     content_pos["y"],
                     content_pos["z"],
@@ -1,7 +1,13 @@
 import tooldelta
+import os
 
-from PIL import Image
+import numpy as np
 import time
+from . import benchmark
+from .color_lut import ColorLUT
+from .quantize import DITHER_MODES, quantize
+from .placement import PRESSURE_PLATE, box_commands, tile_boxes
+from .tiles import iter_chunks, iter_tiles, open_source
 
 tooldelta.plugins.checkSystemVersion((0, 7, 3))
 
@@ -9,16 +15,31 @@ tooldelta.plugins.checkSystemVersion((0, 7, 3))
 @tooldelta.plugins.add_plugin
 class MapArtImporter(tooldelta.Plugin):
     name = "地图画导入"
-    version = (0, 0, 5)
+    version = (0, 0, 10)
     author = "SuperScript"
     description = "导入图片到租赁服"
 
     def __init__(self, frame: tooldelta.ToolDelta):
-        self.color_cache = {}
-        self.color_mapping = {}
-        self.default_block = "concrete"
+        super().__init__(frame)
+        self.make_data_path()
         self.frame = frame
         self.game_ctrl = frame.get_game_control()
+        # 颜色表改变后查找表会自动重新生成
+        self.color_lut = ColorLUT(
+            color_map, os.path.join(self.data_path, "颜色查找表.npz")
+        )
+        CFG = {"抖动模式(无/有序/误差扩散)": "无", "合并相同方块为fill": True}
+        cfg, _ = tooldelta.Config.getPluginConfigAndVersion(
+            self.name, tooldelta.Config.auto_to_std(CFG), CFG, self.version
+        )
+        self.dither = cfg["抖动模式(无/有序/误差扩散)"]
+        self.merge_fill = cfg["合并相同方块为fill"]
+        self.plate_index = next(
+            i for i, (block, _) in enumerate(color_map) if block == PRESSURE_PLATE
+        )
+        if self.dither not in DITHER_MODES:
+            tooldelta.Print.print_war(f"未知的抖动模式 {self.dither}, 将不使用抖动")
+            self.dither = DITHER_MODES[0]
 
     def on_inject(self):
         self.menu = tooldelta.plugins.get_plugin_api("聊天栏菜单", (0, 0, 1))
@@ -26,26 +47,25 @@ class MapArtImporter(tooldelta.Plugin):
             from 前置_聊天栏菜单 import ChatbarMenu
 
             self.menu = tooldelta.plugins.instant_plugin_api(ChatbarMenu)
+        self.interact = tooldelta.plugins.get_plugin_api("前置-世界交互", (0, 0, 6))
+        if tooldelta.TYPE_CHECKING:
+            from 前置_世界交互 import GameInteractive
+
+            self.interact = tooldelta.plugins.instant_plugin_api(GameInteractive)
         self.menu.add_trigger(
             ["像素画"],
             "导入像素画",
             "<文件名> <x坐标> <y坐标> <z坐标>, <尺寸(默认为1x1, 格式: ?x?)>",
             lambda player, args: self.frame.createThread(self.menu_imp, (player, args)),
         )
+        self.frame.add_console_cmd_trigger(
+            ["mapart-bench"], None, "测试1024x1024图片的分析耗时", self.benchmark_menu
+        )
 
-    def get_nearest_color_block(self, rvalue, gvalue, bvalue):
-        if self.color_cache.get((rvalue, gvalue, bvalue)):
-            return self.color_cache[(rvalue, gvalue, bvalue)]
-        max_weight_reversed = 10000000
-        max_matches = "stone", 0
-        for i, item in enumerate(color_map):
-            _, (r, g, b) = item
-            weight = (r - rvalue) ** 2 + (g - gvalue) ** 2 + (b - bvalue) ** 2
-            if weight < max_weight_reversed:
-                max_matches = item[0]
-                max_weight_reversed = weight
-        self.color_cache[(rvalue, gvalue, bvalue)] = max_matches
-        return max_matches
+    def benchmark_menu(self, _):
+        tooldelta.Print.print_inf("正在测试 1024x1024 图片的分析耗时...")
+        for name, cost in benchmark.run(color_map, self.color_lut).items():
+            tooldelta.Print.print_inf(f"{name}: {cost:.2f}秒")
 
     def imp_map(
         self,
@@ -56,28 +76,35 @@ class MapArtImporter(tooldelta.Plugin):
         baseZP: int,
         owner: str,
     ):
-        self.game_ctrl.say_to(owner, "§7读取并分析图片...")
-        img = Image.open(bmap_path).convert("RGB").resize(size)
+        self.game_ctrl.say_to(owner, "§7读取图片...")
+        img = open_source(bmap_path, size)
         xsize, ysize = size
-        scmd = self.game_ctrl.sendwocmd
+        # 由前置-世界交互统一限速
+        scmd = self.interact.governor.send
         self.game_ctrl.say_to(owner, "§7开始导入像素画...")
         TOTAL = xsize * ysize
-        BPS = 800
         progress = 0
+        plates = 0
+        cmd_count = 0
         sname = self.game_ctrl.bot_name
         if not sname:
             raise ValueError("未找到机器人名")
         # /w @s .像素画 a1.png 10048 154 10048 3x2
         # /w @s .像素画 a1.jpg 10048 154 10048 2x2
-        zchunk = 0
-        for xchunk in range(xsize // 16):
-            cmdd = f"/tp {sname} {baseXP + xchunk * 16 + 8} {baseYP + 10} {baseZP + 8}"
+        # 每次只缩放并分析一张地图大小的区域, 放置完成后释放
+        for tile_x, tile_z, rgb in iter_tiles(img, size):
+            grid = quantize(rgb, self.color_lut, self.dither)
+            del rgb
+            tile_xpos = baseXP + tile_x
+            tile_zpos = baseZP + tile_z
+            cmdd = f"/tp {sname} {tile_xpos + 8} {baseYP + 10} {tile_zpos + 8}"
             scmd(cmdd)
             time.sleep(0.5)
-            for zchunk in range(ysize // 16):
-                re_xpos = baseXP + xchunk * 16
-                re_zpos = baseZP + zchunk * 16
-                progress += 256
+            for z0, x0, z1, x1 in iter_chunks(*grid.shape):
+                re_xpos = tile_xpos + x0
+                re_zpos = tile_zpos + z0
+                tile = grid[z0:z1, x0:x1]
+                progress += tile.size
                 nowprogresspcent = int(progress / TOTAL * 100)
                 _prgs = int(progress / TOTAL * 20)
                 nowprogresstext = tooldelta.Print.colormode_replace(
@@ -89,37 +116,18 @@ class MapArtImporter(tooldelta.Plugin):
                 )
                 cmdd = f"/tp {sname} {re_xpos + 8} {baseYP + 10} {re_zpos + 8}"
                 scmd(cmdd)
-                for limx in range(16):
-                    time.sleep(16 / BPS)
-                    for limz in range(16):
-                        image_pixel_x = re_xpos + limx - baseXP
-                        image_pixel_y = re_zpos + limz - baseZP
-                        pixel_rgb = img.getpixel((image_pixel_x, image_pixel_y))
-                        if isinstance(pixel_rgb, tuple):
-                            rget, gget, bget = pixel_rgb
-                        else:
-                            raise ValueError("图片格式错误")
-                        neBlock, neBlock_spec = self.get_nearest_color_block(
-                            rget, gget, bget
-                        )
-                        if (
-                            neBlock == "light_weighted_pressure_plate"
-                            and neBlock_spec == 7
-                        ):
-                            scmd(
-                                f"/setblock {re_xpos + limx} {baseYP} {re_zpos + limz} sponge 0"
-                            )
-                            baseYP += 1
-                            scmd(
-                                f"/setblock {re_xpos + limx} {baseYP} {re_zpos + limz} {neBlock} {neBlock_spec}"
-                            )
-                            baseYP -= 1
-                            continue
-                        scmd(
-                            f"/setblock {re_xpos + limx} {baseYP} {re_zpos + limz} {neBlock} {neBlock_spec}"
-                        )
+                plates += int(np.count_nonzero(tile == self.plate_index))
+                boxes = tile_boxes(tile, self.merge_fill)
+                for cmd in box_commands(boxes, color_map, re_xpos, baseYP, re_zpos):
+                    scmd(cmd)
+                    cmd_count += 1
+        img.close()
         tooldelta.Print.print_suc("像素画导入成功")
-        self.color_cache.clear()
+        # 逐个放置时每个像素一条指令, 压力板还需多一条放置海绵
+        saved = progress + plates - cmd_count
+        tooldelta.Print.print_inf(
+            f"共 {cmd_count} 条指令, 合并节省 {saved} 条 ({saved / max(1, progress + plates):.1%})"
+        )
 
     def menu_imp(self, player: str, args: tuple):
         if len(args) not in (4, 5):
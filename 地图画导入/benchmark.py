@@ -0,0 +1,48 @@
+import time
+import numpy as np
+from PIL import Image
+from .color_lut import ColorLUT
+from .quantize import DITHER_MODES, quantize
+
+
+def test_image(size: int) -> Image.Image:
+    "带渐变和噪点的测试图片, 颜色种类接近照片"
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size, 0:size] / size
+    rgb = np.stack([x * 255, y * 255, (1 - x) * (1 - y) * 255], -1)
+    rgb += rng.normal(0, 24, rgb.shape)
+    return Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8), "RGB")
+
+
+def legacy_analyse(img: Image.Image, color_map: list):
+    "旧版逐像素 getpixel + 线性查找颜色表的分析流程"
+    cache = {}
+    xsize, ysize = img.size
+    for x in range(xsize):
+        for y in range(ysize):
+            rvalue, gvalue, bvalue = img.getpixel((x, y))
+            if cache.get((rvalue, gvalue, bvalue)):
+                continue
+            max_weight_reversed = 10000000
+            max_matches = "stone", 0
+            for item in color_map:
+                _, (r, g, b) = item
+                weight = (r - rvalue) ** 2 + (g - gvalue) ** 2 + (b - bvalue) ** 2
+                if weight < max_weight_reversed:
+                    max_matches = item[0]
+                    max_weight_reversed = weight
+            cache[(rvalue, gvalue, bvalue)] = max_matches
+
+
+def run(color_map: list, lut: ColorLUT, size: int = 1024) -> dict[str, float]:
+    "对比 size x size 图片的分析耗时 (秒)"
+    img = test_image(size)
+    result = {}
+    start = time.perf_counter()
+    legacy_analyse(img, color_map)
+    result["旧版逐像素"] = time.perf_counter() - start
+    for mode in DITHER_MODES:
+        start = time.perf_counter()
+        quantize(np.asarray(img), lut, mode)
+        result[f"整图向量化 (抖动: {mode})"] = time.perf_counter() - start
+    return result
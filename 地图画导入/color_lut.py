@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# 每个颜色通道保留的位数, 6 位即 64x64x64 的查找表 (256 KB)
+LUT_BITS = 6
+# 查找表比较颜色时使用的色彩空间, 改变后缓存失效
+COLOR_SPACE = "CIELAB"
+
+
+def palette_digest(color_map: list) -> str:
+    "颜色表的摘要, 颜色表改变后缓存的查找表即失效"
+    return hashlib.sha1(
+        json.dumps([LUT_BITS, COLOR_SPACE, color_map], sort_keys=True).encode()
+    ).hexdigest()
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    "sRGB (0~255) 转换为 CIELAB (D65), 在 Lab 空间中的距离更接近人眼感知的色差"
+    c = np.asarray(rgb, dtype=np.float64) / 255
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array(
+        [
+            [0.4124, 0.2126, 0.0193],
+            [0.3576, 0.7152, 0.1192],
+            [0.1805, 0.0722, 0.9505],
+        ]
+    )
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack(
+        [
+            116 * f[..., 1] - 16,
+            500 * (f[..., 0] - f[..., 1]),
+            200 * (f[..., 1] - f[..., 2]),
+        ],
+        -1,
+    )
+
+
+def build_lut(colors: np.ndarray) -> np.ndarray:
+    """
+    为每个量化后的 RGB 格子预先计算 Lab 空间中最接近的颜色
+
+    Args:
+        colors: (N, 3) 的颜色表 RGB 值, N 不超过 256
+
+    Returns:
+        (2^LUT_BITS,) * 3 的 uint8 数组, 值为颜色表下标
+    """
+    size = 1 << LUT_BITS
+    step = 256 // size
+    # 取每个格子的中心作为代表色
+    axis = np.arange(size) * step + step // 2
+    palette = rgb_to_lab(colors)
+    lut = np.empty((size, size, size), dtype=np.uint8)
+    gb = np.stack(np.meshgrid(axis, axis, indexing="ij"), -1).reshape(-1, 2)
+    for r in range(size):
+        cells = rgb_to_lab(np.column_stack([np.full(len(gb), axis[r]), gb]))
+        dist = ((cells[:, None, :] - palette[None, :, :]) ** 2).sum(-1)
+        lut[r] = dist.argmin(1).reshape(size, size)
+    return lut
+
+
+class ColorLUT:
+    """
+    颜色表的 RGB -> 颜色下标查找表
+
+    查找表以 npz 格式缓存在 cache_path, 颜色表改变时自动重新生成.
+    """
+
+    def __init__(self, color_map: list, cache_path: str):
+        self.colors = np.array([rgb for _, rgb in color_map], dtype=np.uint8)
+        self.shift = 8 - LUT_BITS
+        digest = palette_digest(color_map)
+        if os.path.isfile(cache_path):
+            try:
+                with np.load(cache_path) as cache:
+                    if str(cache["digest"]) == digest:
+                        self.lut = cache["lut"]
+                        return
+            except (OSError, ValueError, KeyError):
+                pass
+        self.lut = build_lut(self.colors)
+        np.savez(cache_path, digest=digest, lut=self.lut)
+
+    def indices(self, rgb: np.ndarray) -> np.ndarray:
+        "(..., 3) 的 uint8 RGB 数组对应的颜色表下标, 形状为 (...)"
+        q = rgb >> self.shift
+        return self.lut[q[..., 0], q[..., 1], q[..., 2]]
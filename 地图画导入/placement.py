@@ -0,0 +1,68 @@
+import numpy as np
+
+# 需要在下方垫一块海绵的方块
+PRESSURE_PLATE = ["light_weighted_pressure_plate", 7]
+
+
+def tile_boxes(tile: np.ndarray, merge: bool = True) -> list[tuple[int, int, int, int, int]]:
+    """
+    将一块颜色下标网格拆分为同色矩形
+
+    先对每一行做游程编码, 再把上一行中起止位置与颜色都相同的游程向下延伸.
+
+    Args:
+        tile: (z, x) 的颜色下标网格
+        merge: 为 False 时每个像素单独成为一个矩形
+
+    Returns:
+        [(x0, z0, x1, z1, 颜色下标), ...], 坐标相对于网格, 包含两端
+    """
+    rows, cols = tile.shape
+    if not merge:
+        return [
+            (x, z, x, z, int(tile[z, x])) for z in range(rows) for x in range(cols)
+        ]
+    boxes: list[list[int]] = []
+    # (x0, x1, 颜色下标) -> 上一行结束时仍可延伸的矩形
+    open_boxes: dict[tuple[int, int, int], list[int]] = {}
+    for z in range(rows):
+        row = tile[z]
+        starts = np.flatnonzero(np.diff(row)) + 1
+        bounds = np.concatenate(([0], starts, [cols])).tolist()
+        values = row[bounds[:-1]].tolist()
+        next_open = {}
+        for x0, x1, idx in zip(bounds[:-1], bounds[1:], values):
+            key = (x0, x1 - 1, idx)
+            box = open_boxes.get(key)
+            if box is None:
+                box = [x0, z, x1 - 1, z, idx]
+                boxes.append(box)
+            else:
+                box[3] = z
+            next_open[key] = box
+        open_boxes = next_open
+    return [tuple(box) for box in boxes]
+
+
+def box_commands(
+    boxes: list[tuple[int, int, int, int, int]],
+    color_map: list,
+    x: int,
+    y: int,
+    z: int,
+) -> list[str]:
+    "将矩形转换为 setblock / fill 指令, (x, y, z) 为网格原点对应的坐标"
+    cmds = []
+    for x0, z0, x1, z1, idx in boxes:
+        block, spec = color_map[idx][0]
+        layers = [(y, block, spec)]
+        if [block, spec] == PRESSURE_PLATE:
+            layers = [(y, "sponge", 0), (y + 1, block, spec)]
+        for by, b, s in layers:
+            if x0 == x1 and z0 == z1:
+                cmds.append(f"/setblock {x + x0} {by} {z + z0} {b} {s}")
+            else:
+                cmds.append(
+                    f"/fill {x + x0} {by} {z + z0} {x + x1} {by} {z + z1} {b} {s}"
+                )
+    return cmds
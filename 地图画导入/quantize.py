@@ -0,0 +1,98 @@
+import numpy as np
+from .color_lut import ColorLUT
+
+# 抖动模式
+DITHER_NONE = "无"
+DITHER_ORDERED = "有序"
+DITHER_FLOYD = "误差扩散"
+DITHER_MODES = (DITHER_NONE, DITHER_ORDERED, DITHER_FLOYD)
+
+# 有序抖动的扰动幅度 (RGB 单位)
+ORDERED_STRENGTH = 32
+
+
+def bayer_matrix(n: int = 8) -> np.ndarray:
+    "n x n 的 Bayer 阈值矩阵, 取值均匀分布在 [-0.5, 0.5)"
+    m = np.zeros((1, 1), dtype=np.int32)
+    while m.shape[0] < n:
+        m = np.block([[4 * m, 4 * m + 2], [4 * m + 3, 4 * m + 1]])
+    return (m + 0.5) / m.size - 0.5
+
+
+def quantize(rgb: np.ndarray, lut: ColorLUT, dither: str = DITHER_NONE) -> np.ndarray:
+    """
+    将整张图片一次性转换为颜色表下标
+
+    Args:
+        rgb: (高, 宽, 3) 的 uint8 图片数组, 如 np.asarray(img.convert("RGB"))
+        lut: 颜色查找表
+        dither: 抖动模式, 见 DITHER_MODES
+
+    Returns:
+        (高, 宽) 的 uint8 颜色表下标
+    """
+    if dither == DITHER_NONE:
+        return lut.indices(rgb)
+    if dither == DITHER_ORDERED:
+        h, w, _ = rgb.shape
+        bayer = bayer_matrix()
+        noise = np.tile(bayer, (h // 8 + 1, w // 8 + 1))[:h, :w, None]
+        noisy = rgb + noise * ORDERED_STRENGTH
+        return lut.indices(np.clip(noisy, 0, 255).astype(np.uint8))
+    if dither == DITHER_FLOYD:
+        return floyd_steinberg(rgb, lut)
+    raise ValueError(f"未知的抖动模式: {dither}")
+
+
+def floyd_steinberg(rgb: np.ndarray, lut: ColorLUT) -> np.ndarray:
+    """
+    Floyd-Steinberg 误差扩散抖动, 蛇形扫描
+
+    误差扩散每个像素都依赖前一个像素, 无法整体向量化;
+    逐行处理, 行内使用纯 Python 数值以减少 NumPy 的单元素开销.
+    """
+    h, w, _ = rgb.shape
+    table = lut.lut.reshape(-1).tolist()
+    shift = lut.shift
+    bits = 8 - shift
+    palette = lut.colors.astype(np.int32).tolist()
+    out = np.empty((h, w), dtype=np.uint8)
+    cur = rgb[0].astype(np.float64).reshape(-1).tolist()
+    for y in range(h):
+        nxt = (
+            rgb[y + 1].astype(np.float64).reshape(-1).tolist() if y + 1 < h else None
+        )
+        row = [0] * w
+        if y % 2:
+            xs, step = range(w - 1, -1, -1), -1
+        else:
+            xs, step = range(w), 1
+        for x in xs:
+            i = x * 3
+            rf = min(255.0, max(0.0, cur[i]))
+            gf = min(255.0, max(0.0, cur[i + 1]))
+            bf = min(255.0, max(0.0, cur[i + 2]))
+            idx = table[
+                (((int(rf) >> shift) << bits) | (int(gf) >> shift)) << bits
+                | (int(bf) >> shift)
+            ]
+            row[x] = idx
+            pr, pg, pb = palette[idx]
+            er, eg, eb = rf - pr, gf - pg, bf - pb
+            fx = x + step
+            if 0 <= fx < w:
+                j = fx * 3
+                cur[j] += er * 0.4375
+                cur[j + 1] += eg * 0.4375
+                cur[j + 2] += eb * 0.4375
+            if nxt is not None:
+                for dx, k in ((-step, 0.1875), (0, 0.3125), (step, 0.0625)):
+                    nx = x + dx
+                    if 0 <= nx < w:
+                        j = nx * 3
+                        nxt[j] += er * k
+                        nxt[j + 1] += eg * k
+                        nxt[j + 2] += eb * k
+        out[y] = row
+        cur = nxt
+    return out
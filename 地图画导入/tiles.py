@@ -0,0 +1,56 @@
+import numpy as np
+from PIL import Image
+
+# 一张地图的大小, 图片按此大小分块读取与放置
+TILE_SIZE = 128
+# 放置时每次传送覆盖的区域大小
+CHUNK_SIZE = 16
+
+
+def open_source(path: str, size: tuple[int, int]) -> Image.Image:
+    """
+    打开图片但不立即解码
+
+    JPEG 等格式会通过 draft 在解码时直接缩小到不低于目标尺寸的分辨率, 减少内存占用.
+    """
+    img = Image.open(path)
+    img.draft("RGB", size)
+    if img.mode not in ("RGB", "RGBA", "L"):
+        # 调色板等模式不支持区域缩放
+        img = img.convert("RGB")
+    return img
+
+
+def iter_tiles(img: Image.Image, size: tuple[int, int], tile: int = TILE_SIZE):
+    """
+    将图片按目标尺寸逐块缩放, 每次只生成一块
+
+    Args:
+        img: open_source 打开的图片
+        size: 目标尺寸 (宽, 高)
+        tile: 块大小
+
+    Yields:
+        (x0, z0, rgb): 块在目标图片中的左上角坐标, 以及 (高, 宽, 3) 的 uint8 数组;
+        位于右侧与下侧边缘的块可能小于 tile
+    """
+    xsize, ysize = size
+    scale_x = img.width / xsize
+    scale_z = img.height / ysize
+    for x0 in range(0, xsize, tile):
+        x1 = min(xsize, x0 + tile)
+        for z0 in range(0, ysize, tile):
+            z1 = min(ysize, z0 + tile)
+            part = img.resize(
+                (x1 - x0, z1 - z0),
+                box=(x0 * scale_x, z0 * scale_z, x1 * scale_x, z1 * scale_z),
+                reducing_gap=2.0,
+            )
+            yield x0, z0, np.asarray(part.convert("RGB"))
+
+
+def iter_chunks(rows: int, cols: int, chunk: int = CHUNK_SIZE):
+    "将 (rows, cols) 的网格按 chunk 分块, 产出 (z0, x0, z1, x1), 边缘的块可能不完整"
+    for x0 in range(0, cols, chunk):
+        for z0 in range(0, rows, chunk):
+            yield z0, x0, min(rows, z0 + chunk), min(cols, x0 + chunk)
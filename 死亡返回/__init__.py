@@ -9,19 +9,22 @@ from tooldelta.plugin_load.injected_plugin import (
     player_death,
     player_message_info,
 )
+from tooldelta import plugins
 from tooldelta.game_utils import (
     get_all_player,
     tellrawText,
-    getPos,
 )
 
 
 __plugin_meta__ = {
     "name": "死亡返回",
-    "version": "0.1.2",
+    "version": "0.1.3",
     "author": "wling/7912",
 }
 
+# 坐标请求经由基本插件功能库合并为 querytarget @a
+getPos = plugins.get_plugin_api("基本插件功能库", (0, 0, 12)).getPos
+
 
 LOG_DEATH_TIME = 30  # 记录最小频率 (秒)
 plugin_path = r"插件数据文件/死亡返回"
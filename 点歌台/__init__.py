@@ -4,14 +4,13 @@ from typing import TYPE_CHECKING, ClassVar
 
 from tooldelta import Builtins, Plugin, plugins
 from tooldelta.frame import ToolDelta
-from tooldelta.game_utils import getScore
 
 
 @plugins.add_plugin
 class DJTable(Plugin):
     author = "Sup3rScr1pt"
     name = "点歌台"
-    version = (0, 1, 5)
+    version = (0, 1, 6)
 
     musics_list: ClassVar[list] = []
     MAX_SONGS_QUEUED = 6
@@ -25,12 +24,15 @@ class DJTable(Plugin):
     def on_def(self):
         self.midiplayer = plugins.get_plugin_api("MIDI播放器")
         self.chatmenu = plugins.get_plugin_api("聊天栏菜单")
+        self.funclib = plugins.get_plugin_api("基本插件功能库", (0, 0, 11))
         if TYPE_CHECKING:
             from 前置_MIDI播放器 import ToolMidiMixer
             from 前置_聊天栏菜单 import ChatbarMenu
+            from 前置_基本插件功能库 import BasicFunctionLib
 
             self.midiplayer = plugins.instant_plugin_api(ToolMidiMixer)
             self.chatmenu = plugins.instant_plugin_api(ChatbarMenu)
+            self.funclib = plugins.instant_plugin_api(BasicFunctionLib)
         mdir = os.path.join(self.data_path, "音乐列表")
         for i in os.listdir(mdir):
             if i.endswith(".mid"):
@@ -73,7 +75,7 @@ class DJTable(Plugin):
             self.game_ctrl.say_to("@a", "§e点歌§f>> §c此音乐未被收录")
         elif len(self.musics_list) >= self.MAX_SONGS_QUEUED:
             self.game_ctrl.say_to("@a", "§e点歌§f>> §c等待列表已满，请等待这首歌播放完")
-        elif getScore("song_point", player) <= 0:
+        elif self.funclib.getScore("song_point", player) <= 0:
             self.game_ctrl.say_to(
                 player, "§e点歌§f>> §c音乐点数不足，点歌一次需消耗§e1§c点"
             )
@@ -1,13 +1,13 @@
-from tooldelta import Frame, plugins, Plugin
+from tooldelta import Frame, plugins, Plugin, TYPE_CHECKING
 from tooldelta.game_utils import getTarget
-
-import time
+from .clone_engine import clone_command, plan_clones
+from .region_scheduler import RegionScheduler, plan_fill
 
 
 @plugins.add_plugin
 class WorldEdit(Plugin):
     author = "SuperScript"
-    version = (0, 0, 8)
+    version = (0, 0, 11)
     name = "简易建造"
     description = "以更方便的方法在租赁服进行创作, 输入.we help查看说明"
 
@@ -20,14 +20,31 @@ class WorldEdit(Plugin):
         from 前置_聊天栏菜单 import ChatbarMenu
 
         self.add_trigger = plugins.instant_plugin_api(ChatbarMenu).add_trigger
+        self.interact = plugins.get_plugin_api("前置-世界交互", (0, 0, 6))
+        if TYPE_CHECKING:
+            from 前置_世界交互 import GameInteractive
+
+            self.interact = plugins.instant_plugin_api(GameInteractive)
+        self.scheduler = RegionScheduler(self.game_ctrl, self.interact.governor)
         self.getX = None
         self.getY = None
         self.getZ = None
+        # We end 设置的复制源区域第二点, 未设置时只复制起点一个方块
+        self.endPos: tuple[int, int, int] | None = None
 
     def on_inject(self):
         self.add_trigger(
             ["we help"], None, "查看 简易建造插件 的使用说明", self.description_show
         )
+        self.add_trigger(
+            ["we cancel"], None, "取消正在进行的填充或复制", self.cancel_task
+        )
+
+    def cancel_task(self, who: str, _):
+        if self.scheduler.cancel():
+            self.game_ctrl.say_to(who, "§c§lWorldEdit§r>> §a已取消")
+        else:
+            self.game_ctrl.say_to(who, "§c§lWorldEdit§r>> §7当前没有进行中的操作")
 
     def description_show(self, who: str, _):
         self.game_ctrl.say_to(
@@ -68,6 +85,7 @@ class WorldEdit(Plugin):
                 self.getX = int(jsonPkt["NBTData"]["x"])
                 self.getY = int(jsonPkt["NBTData"]["y"])
                 self.getZ = int(jsonPkt["NBTData"]["z"])
+                self.endPos = None
                 if signPlayerName in getTarget("@a[m=1]"):
                     self.game_ctrl.sendcmd(
                         f"/setblock {self.getX} {self.getY} {self.getZ} air"
@@ -76,6 +94,24 @@ class WorldEdit(Plugin):
                         signPlayerName,
                         f"§a设置第一点: {self.getX}, {self.getY}, {self.getZ}",
                     )
+            elif signText == "We end":
+                x, y, z = (
+                    int(jsonPkt["NBTData"]["x"]),
+                    int(jsonPkt["NBTData"]["y"]),
+                    int(jsonPkt["NBTData"]["z"]),
+                )
+                try:
+                    signPlayerName = getTarget(f"@a[x={x}, y={y}, z={z}, c=1, r=8]")[0]
+                    if signPlayerName in getTarget("@a[m=1]"):
+                        self.endPos = (x, y, z)
+                        self.game_ctrl.sendcmd(f"/setblock {x} {y} {z} air")
+                        self.game_ctrl.say_to(
+                            signPlayerName, f"§a设置复制区域第二点: {x}, {y}, {z}"
+                        )
+                except Exception as err:
+                    self.game_ctrl.say_to(
+                        "@a", f"§c告示牌简易建造 (x={x}, y={y}, z={z}) 失败: {err}"
+                    )
 
             elif (
                 jsonPkt["NBTData"]["FrontText"]["Text"].startswith("We fill ")
@@ -103,11 +139,14 @@ class WorldEdit(Plugin):
                     if signPlayerName in getTarget("@a[m=1]"):
                         if not self.getX:
                             raise AssertionError
-                        self.game_ctrl.sendcmd(
-                            f"/fill {self.getX} {self.getY} {self.getZ} {getXend} {getYend} {getZend} {blockData}"
-                        )
-                        self.game_ctrl.say_to(
-                            signPlayerName, "§c§lWorldEdit§r>> §a填充完成"
+                        self.frame.createThread(
+                            self.fill_region,
+                            (
+                                signPlayerName,
+                                (self.getX, self.getY, self.getZ),
+                                (getXend, getYend, getZend),
+                                blockData,
+                            ),
                         )
                     else:
                         self.game_ctrl.say_to(
@@ -125,15 +164,18 @@ class WorldEdit(Plugin):
                         f"@a[x={jsonPkt['NBTData']['x']}, y={jsonPkt['NBTData']['y']}, z={jsonPkt['NBTData']['z']}, c=1, r=10]"
                     )[0]
                     if signPlayerName in getTarget("@a[m=1]"):
+                        start = (self.getX, self.getY, self.getZ)
                         self.frame.createThread(
-                            self.fillwith,
+                            self.clone_region,
                             (
-                                self.getX,
-                                self.getY,
-                                self.getZ,
-                                int(jsonPkt["NBTData"]["x"]),
-                                int(jsonPkt["NBTData"]["y"]),
-                                int(jsonPkt["NBTData"]["z"]),
+                                signPlayerName,
+                                start,
+                                self.endPos or start,
+                                (
+                                    int(jsonPkt["NBTData"]["x"]),
+                                    int(jsonPkt["NBTData"]["y"]),
+                                    int(jsonPkt["NBTData"]["z"]),
+                                ),
                             ),
                         )
                 except Exception as err:
@@ -143,16 +185,78 @@ class WorldEdit(Plugin):
                     )
         return False
 
-    def fillwith(self, sx, sy, sz, dx, dy, dz):
-        def p2n(n):
-            return 1 if n >= 0 else -1
-        fx = p2n(dx - sx)
-        fy = p2n(dy - sy)
-        fz = p2n(dz - sz)
-        for x in range(sx, dx + fx, fx):
-            for y in range(sy, dy + fy, fy):
-                for z in range(sz, dz + fz, fz):
-                    self.game_ctrl.sendwocmd(
-                        f"/clone {sx} {sy} {sz} {sx} {sy} {sz} {x} {y} {z}"
-                    )
-                    time.sleep(0.01)
+    def run_task(self, player: str, name: str, groups: list):
+        if self.scheduler.busy:
+            self.game_ctrl.say_to(
+                player, "§c§lWorldEdit§r>> §c已有操作正在进行, 可输入 we cancel 取消"
+            )
+            return
+        if self.scheduler.run(player, name, groups):
+            self.game_ctrl.say_to(player, f"§c§lWorldEdit§r>> §a{name}完成")
+
+    def fill_region(
+        self,
+        player: str,
+        first: tuple[int, int, int],
+        second: tuple[int, int, int],
+        block: str,
+    ):
+        """
+        填充区域, 超过 fill 体积上限的区域会按区块组拆分后依次填充
+
+        Args:
+            player: 执行者
+            first, second: 区域的两个角
+            block: 方块 (fill 指令中坐标之后的部分)
+        """
+        lo = tuple(map(min, first, second))
+        hi = tuple(map(max, first, second))
+        groups = [
+            (
+                center,
+                [
+                    "/fill {} {} {} {} {} {} ".format(*box_lo, *box_hi) + block
+                    for box_lo, box_hi in boxes
+                ],
+            )
+            for center, boxes in plan_fill(lo, hi)
+        ]
+        self.run_task(player, "填充", groups)
+
+    def clone_region(
+        self,
+        player: str,
+        first: tuple[int, int, int],
+        second: tuple[int, int, int],
+        end: tuple[int, int, int],
+        tp_radius: int = 48,
+    ):
+        """
+        将 first 与 second 围成的源区域重复铺满到 end, 使用倍增复制
+
+        Args:
+            player: 执行者
+            first, second: 源区域的两个角
+            end: 目标区域的终点, 目标区域为源区域与该点围成的区域
+            tp_radius: 复制的源区域或目标区域的任一角与机器人的水平距离超过该值时,
+                先传送到该次复制处
+        """
+        src_lo = tuple(map(min, first, second))
+        src_hi = tuple(map(max, first, second))
+        target_lo = tuple(map(min, src_lo, end))
+        target_hi = tuple(map(max, src_hi, end))
+        groups: list[tuple[tuple[int, int, int], list[str]]] = []
+        for lo, hi, dest in plan_clones(src_lo, src_hi, target_lo, target_hi):
+            # 源区域与目标区域的水平外接范围
+            x0, z0 = min(lo[0], dest[0]), min(lo[2], dest[2])
+            x1 = max(hi[0], dest[0] + hi[0] - lo[0])
+            z1 = max(hi[2], dest[2] + hi[2] - lo[2])
+            if groups:
+                bx, _, bz = groups[-1][0]
+                if max(bx - x0, x1 - bx, bz - z0, z1 - bz) <= tp_radius:
+                    groups[-1][1].append(clone_command(lo, hi, dest))
+                    continue
+            y = dest[1] + (hi[1] - lo[1]) // 2
+            groups.append((((x0 + x1) // 2, y, (z0 + z1) // 2), []))
+            groups[-1][1].append(clone_command(lo, hi, dest))
+        self.run_task(player, "复制", groups)
@@ -0,0 +1,122 @@
+"""
+倍增复制引擎
+
+把源区域平铺到目标区域时, 不再逐个方块 clone, 而是沿每个轴把已经填好的部分复制到相邻的空位上,
+已填充的长度每次翻倍, N 格长的轴只需 O(log N) 条 clone 指令.
+为保证源与目标所在区块同时加载, 水平方向每次复制的长度不超过 MAX_STEP,
+且每条 clone 的水平跨度不超过 MAX_SPAN, 体积不超过 CLONE_VOLUME_LIMIT.
+"""
+
+Vec = tuple[int, int, int]
+
+# clone 指令一次最多复制的方块数
+CLONE_VOLUME_LIMIT = 32768
+# 水平方向单次复制的最大长度, 超过后按此长度线性推进
+MAX_STEP = 32
+# 单条 clone 指令的最大水平跨度
+MAX_SPAN = 32
+
+
+def split_box(
+    lo: Vec, hi: Vec, limit: int = CLONE_VOLUME_LIMIT
+) -> list[tuple[Vec, Vec]]:
+    "将区域拆分为体积不超过 limit, 水平跨度不超过 MAX_SPAN 的子区域"
+    size = [b - a + 1 for a, b in zip(lo, hi)]
+    volume = size[0] * size[1] * size[2]
+    # 优先切分超出跨度的水平轴, 其次切分最长的轴
+    axis = next((a for a in (0, 2) if size[a] > MAX_SPAN), None)
+    if axis is None:
+        if volume <= limit:
+            return [(lo, hi)]
+        axis = max(range(3), key=lambda a: size[a])
+    if axis != 1 and size[axis] > MAX_SPAN:
+        cut = MAX_SPAN
+    else:
+        cut = size[axis] // 2
+    mid_hi = list(hi)
+    mid_hi[axis] = lo[axis] + cut - 1
+    mid_lo = list(lo)
+    mid_lo[axis] = lo[axis] + cut
+    return split_box(lo, tuple(mid_hi), limit) + split_box(
+        tuple(mid_lo), hi, limit
+    )
+
+
+def _axis_steps(
+    flo: int, fhi: int, tlo: int, thi: int, period: int, cap: int | None
+):
+    """
+    单个轴上的倍增步骤
+
+    Args:
+        flo, fhi: 已填充的范围
+        tlo, thi: 目标范围
+        period: 源区域在该轴上的长度 (图案的周期)
+        cap: 单次复制的最大长度, None 为不限制
+
+    Yields:
+        (源起点, 长度, 目标起点)
+    """
+    if cap is not None:
+        cap = max(period, cap // period * period)
+    while fhi < thi:
+        # 已填充部分中完整周期的长度, 保证取得到相位一致的源
+        n = min((fhi - flo + 1) // period * period, thi - fhi)
+        if cap is not None:
+            n = min(n, cap)
+        # 源的相位须与目标一致, 取紧邻目标且相差整数个周期的一段
+        src = fhi + 1 - -(-n // period) * period
+        yield src, n, fhi + 1
+        fhi += n
+    while flo > tlo:
+        n = min((fhi - flo + 1) // period * period, flo - tlo)
+        if cap is not None:
+            n = min(n, cap)
+        src = flo - n + -(-n // period) * period
+        yield src, n, flo - n
+        flo -= n
+
+
+def plan_clones(
+    src_lo: Vec, src_hi: Vec, target_lo: Vec, target_hi: Vec
+) -> list[tuple[Vec, Vec, Vec]]:
+    """
+    生成把源区域平铺满目标区域的 clone 步骤
+
+    目标区域须包含源区域; 依次沿 x, y, z 轴倍增, 后一个轴复制的是前面轴已经铺满的整片区域.
+
+    Args:
+        src_lo, src_hi: 源区域的最小 / 最大坐标
+        target_lo, target_hi: 目标区域的最小 / 最大坐标
+
+    Returns:
+        [(源最小坐标, 源最大坐标, 目标最小坐标), ...], 须按顺序执行
+    """
+    for a in range(3):
+        if not (target_lo[a] <= src_lo[a] <= src_hi[a] <= target_hi[a]):
+            raise ValueError("目标区域须包含源区域")
+    clones = []
+    filled_lo, filled_hi = list(src_lo), list(src_hi)
+    for axis in range(3):
+        cap = None if axis == 1 else MAX_STEP
+        period = src_hi[axis] - src_lo[axis] + 1
+        for src, n, dst in _axis_steps(
+            filled_lo[axis],
+            filled_hi[axis],
+            target_lo[axis],
+            target_hi[axis],
+            period,
+            cap,
+        ):
+            lo, hi = list(filled_lo), list(filled_hi)
+            lo[axis], hi[axis] = src, src + n - 1
+            for sub_lo, sub_hi in split_box(tuple(lo), tuple(hi)):
+                dest = list(sub_lo)
+                dest[axis] += dst - src
+                clones.append((sub_lo, sub_hi, tuple(dest)))
+        filled_lo[axis], filled_hi[axis] = target_lo[axis], target_hi[axis]
+    return clones
+
+
+def clone_command(lo: Vec, hi: Vec, dest: Vec) -> str:
+    return "/clone {} {} {} {} {} {} {} {} {}".format(*lo, *hi, *dest)
@@ -0,0 +1,113 @@
+import threading
+import time
+
+Vec = tuple[int, int, int]
+
+# fill 指令一次最多填充的方块数
+FILL_VOLUME_LIMIT = 32768
+# 每次传送后处理的水平区域边长 (4x4 个区块), 机器人位于中心时整块区域都已加载
+GROUP_SIZE = 64
+
+
+def plan_fill(
+    lo: Vec, hi: Vec, limit: int = FILL_VOLUME_LIMIT
+) -> list[tuple[Vec, list[tuple[Vec, Vec]]]]:
+    """
+    将填充区域按区块组拆分为不超过体积上限的子区域
+
+    区块组与 GROUP_SIZE 对齐, 按蛇形顺序排列, 相邻两组的传送距离最短.
+
+    Returns:
+        [(机器人传送位置, [(子区域最小坐标, 子区域最大坐标), ...]), ...]
+    """
+    groups = []
+    x_starts = range(lo[0] // GROUP_SIZE * GROUP_SIZE, hi[0] + 1, GROUP_SIZE)
+    for i, gx in enumerate(x_starts):
+        z_starts = range(lo[2] // GROUP_SIZE * GROUP_SIZE, hi[2] + 1, GROUP_SIZE)
+        if i % 2:
+            z_starts = reversed(z_starts)
+        for gz in z_starts:
+            x0, x1 = max(lo[0], gx), min(hi[0], gx + GROUP_SIZE - 1)
+            z0, z1 = max(lo[2], gz), min(hi[2], gz + GROUP_SIZE - 1)
+            layer = (x1 - x0 + 1) * (z1 - z0 + 1)
+            height = max(1, limit // layer)
+            boxes = [
+                ((x0, y, z0), (x1, min(hi[1], y + height - 1), z1))
+                for y in range(lo[1], hi[1] + 1, height)
+            ]
+            center = ((x0 + x1) // 2, (lo[1] + hi[1]) // 2, (z0 + z1) // 2)
+            groups.append((center, boxes))
+    return groups
+
+
+class RegionScheduler:
+    """
+    依次执行分组的区域操作指令
+
+    每组指令执行前将机器人传送到该组位置并等待区块加载,
+    指令经由前置-世界交互的限速器发送, 进度与剩余时间显示在执行者的 actionbar 上.
+    同一时间只运行一个任务, 可随时通过 cancel 取消.
+    """
+
+    def __init__(self, game_ctrl, governor, load_wait: float = 0.5):
+        self.game_ctrl = game_ctrl
+        self.governor = governor
+        self.load_wait = load_wait
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def cancel(self) -> bool:
+        "取消正在运行的任务, 没有任务时返回 False"
+        if not self.busy:
+            return False
+        self._cancel.set()
+        return True
+
+    def run(
+        self, player: str, name: str, groups: list[tuple[Vec, list[str]]]
+    ) -> bool:
+        """
+        执行任务
+
+        Args:
+            player: 接收进度的玩家
+            name: 任务名, 显示在进度中
+            groups: [(机器人传送位置, [指令, ...]), ...]
+
+        Returns:
+            bool: 是否全部执行完毕; 已有任务在运行或被取消时返回 False
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._cancel.clear()
+            total = sum(len(cmds) for _, cmds in groups)
+            done = 0
+            start = timer = time.time()
+            for (x, y, z), cmds in groups:
+                self.game_ctrl.sendwocmd(f"/tp {self.game_ctrl.bot_name} {x} {y} {z}")
+                time.sleep(self.load_wait)
+                for cmd in cmds:
+                    if self._cancel.is_set():
+                        self.game_ctrl.player_actionbar(
+                            player, f"§c{name} 已取消 ({done}/{total})"
+                        )
+                        return False
+                    self.governor.send(cmd)
+                    done += 1
+                    if (now := time.time()) - timer >= 1:
+                        timer = now
+                        eta = (now - start) / done * (total - done)
+                        self.game_ctrl.player_actionbar(
+                            player,
+                            f"§a{name} §f{done}/{total} §7({done / total:.0%}) "
+                            f"§f预计剩余 {eta:.0f}秒",
+                        )
+            self.game_ctrl.player_actionbar(player, f"§a{name} 完成 ({total}条指令)")
+            return True
+        finally:
+            self._lock.release()
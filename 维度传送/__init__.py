@@ -1,10 +1,9 @@
 import asyncio
 from tooldelta.plugin_load.injected_plugin import init
-from tooldelta import Print
+from tooldelta import Print, plugins
 from tooldelta.game_utils import (
     get_robotname,
     getBlockTile,
-    getPos,
     getTarget,
     sendcmd,
     countdown,
@@ -13,10 +12,13 @@ from tooldelta.game_utils import (
 
 __plugin_meta__ = {
     "name": "维度传送",
-    "version": "0.0.3",
+    "version": "0.0.4",
     "author": "wling/7912",
 }
 
+# 坐标请求经由基本插件功能库合并为 querytarget @a
+getPos = plugins.get_plugin_api("基本插件功能库", (0, 0, 12)).getPos
+
 
 def tp(target, *, x, y, z, dimension):
     if dimension == 0:
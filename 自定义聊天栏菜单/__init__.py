@@ -1,5 +1,5 @@
 import re
-from tooldelta import ToolDelta, Plugin, plugins, Config, Utils, Print, game_utils
+from tooldelta import ToolDelta, Plugin, plugins, Config, Utils, Print
 from tooldelta import TYPE_CHECKING
 
 plugins.checkSystemVersion((0, 7, 1))
@@ -8,7 +8,7 @@ plugins.checkSystemVersion((0, 7, 1))
 class CustomChatbarMenu(Plugin):
     name = "自定义聊天栏菜单"
     author = "SuperScript"
-    version = (0, 0, 5)
+    version = (0, 0, 6)
     description = "自定义ToolDelta的聊天栏菜单触发词等"
 
     args_match_rule = re.compile(r"(\[参数:([0-9]+)\])")
@@ -75,9 +75,13 @@ class CustomChatbarMenu(Plugin):
 
     def on_def(self):
         self.chatbar = plugins.get_plugin_api("聊天栏菜单")
+        # 计分板占位符从基本插件功能库的计分板缓存中读取
+        self.funclib = plugins.get_plugin_api("基本插件功能库", (0, 0, 11))
         if TYPE_CHECKING:
             from 前置_聊天栏菜单 import ChatbarMenu
+            from 前置_基本插件功能库 import BasicFunctionLib
             self.chatbar = plugins.instant_plugin_api(ChatbarMenu)
+            self.funclib = plugins.instant_plugin_api(BasicFunctionLib)
 
     @Utils.thread_func("初始化菜单项")
     def on_inject(self):
@@ -116,7 +120,7 @@ class CustomChatbarMenu(Plugin):
         res = self.scb_simple_rule.findall(sub)
         for scb_name in res:
             try:
-                score = str(game_utils.getScore(scb_name, user, 3))
+                score = str(self.funclib.getScore(scb_name, user))
             except ValueError:
                 score = "<未知>"
                 Print.print_war(f"自定义聊天栏菜单: 获取 {scb_name}:{user} 的分数失败")
@@ -127,7 +131,7 @@ class CustomChatbarMenu(Plugin):
         for scb_name, scb_repl in res:
             try:
                 repl_text = f"<未知分数>"
-                score = game_utils.getScore(scb_name, user, 3)
+                score = self.funclib.getScore(scb_name, user)
                 repl_text = f"<未知替换样式:{score}>"
                 res2 = self.scb_replace_next_rule.findall(scb_repl)
                 for scb_num_repl, scb_str_repl in res2: